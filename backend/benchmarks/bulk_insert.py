@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Deck persistence benchmark: ORM unit of work vs multi-row INSERT.
+
+Times ``persist_generated_deck()`` (deck and cards written with multi-row
+INSERTs, user counters with one UPDATE) against the previous implementation,
+which added one ``Flashcard`` object per question and let the session flush
+them, for several deck sizes. Both paths screen the questions for
+near-duplicates first, as generation does, so only the write strategy
+differs. Each run is flushed and rolled back so every iteration starts from
+the same database.
+
+Run with ``NEAR_DUPLICATE_DETECTION=False`` to time the writes alone.
+
+Usage:
+    python benchmarks/bulk_insert.py
+    python benchmarks/bulk_insert.py --cards 50 --cards 200 --iterations 100 --output bulk.json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+NOTES = """
+Photosynthesis is the process by which green plants convert light energy into chemical energy.
+Chlorophyll in the chloroplasts absorbs light, mostly in the blue and red wavelengths.
+The Calvin cycle takes place in the stroma and uses ATP and NADPH to fix carbon dioxide into glucose.
+"""
+
+
+def make_questions(count):
+    # Distinct random words, so near-duplicate screening keeps every question
+    rng = random.Random(count)
+    return [{
+        'question': f'Synthetic question about {rng.getrandbits(48):x} and {rng.getrandbits(48):x} in photosynthesis?',
+        'type': 'multiple-choice',
+        'options': ['Chlorophyll', 'Stroma', 'Thylakoid', 'Stomata'],
+        'correct_answer': 'Chlorophyll',
+        'explanation': 'Chlorophyll absorbs the light used in photosynthesis.',
+        'difficulty_level': 'medium',
+        'topic': 'photosynthesis'
+    } for i in range(count)]
+
+
+def orm_persist(app_module, user, notes, questions):
+    """The per-object implementation persist_generated_deck() replaced"""
+    db, Deck, Flashcard = app_module.db, app_module.Deck, app_module.Flashcard
+    screening = app_module.near_duplicate_index.screen(user.id, questions)
+    questions = screening.kept
+    app_module.deck_quota.reserve(user)
+
+    deck = Deck(
+        user_id=user.id,
+        title=notes[:50] + ('...' if len(notes) > 50 else ''),
+        original_notes=notes,
+        notes_hash=app_module.notes_fingerprint(notes),
+        total_cards=len(questions)
+    )
+    db.session.add(deck)
+    db.session.flush()
+
+    flashcards = []
+    for question_data in questions:
+        card = Flashcard(
+            deck_id=deck.id,
+            question=question_data['question'],
+            question_type=question_data['type'],
+            options=question_data.get('options', []),
+            correct_answer=question_data['correct_answer'],
+            explanation=question_data.get('explanation', ''),
+            difficulty_level=question_data.get('difficulty_level', 'medium'),
+            topic=question_data.get('topic', 'general')
+        )
+        db.session.add(card)
+        flashcards.append(card)
+    db.session.flush()
+    app_module.near_duplicate_index.cards_saved(user.id, [card.id for card in flashcards], screening.fingerprints)
+
+    user.total_decks += 1
+    user.total_cards += len(questions)
+    user.last_activity = datetime.utcnow()
+    return deck, flashcards
+
+
+def bulk_persist(app_module, user, notes, questions):
+    return app_module.persist_generated_deck(user, notes, questions)
+
+
+def run(app_module, persist, user_id, cards, iterations, warmup, query_counter):
+    db = app_module.db
+    questions = make_questions(cards)
+    timings, queries = [], []
+
+    for i in range(warmup + iterations):
+        user = db.session.get(app_module.User, user_id)
+        query_counter['n'] = 0
+        started = time.perf_counter()
+        deck, flashcards = persist(app_module, user, NOTES, questions)
+        db.session.flush()
+        app_module.generated_deck_response(deck, flashcards)
+        elapsed = time.perf_counter() - started
+        statements = query_counter['n']
+        db.session.rollback()
+
+        if i >= warmup:
+            timings.append(elapsed * 1000)
+            queries.append(statements)
+
+    timings.sort()
+    return {
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'queries': max(queries)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare ORM and multi-row INSERT deck persistence')
+    parser.add_argument('--cards', type=int, action='append', help='Cards per deck (repeatable)')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+    sizes = args.cards or [10, 50, 100, 200]
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='bulk-insert-'), 'bulk.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ.pop('OPENROUTER_API_KEY', None)
+    os.environ['OPENROUTER_VALIDATE_ON_STARTUP'] = 'False'
+    sys.path.insert(0, BACKEND_DIR)
+
+    import logging
+    logging.disable(logging.ERROR)
+
+    import app as app_module
+    from sqlalchemy import event
+
+    query_counter = {'n': 0}
+
+    def count_query(*_):
+        query_counter['n'] += 1
+
+    results = {'created_at': datetime.utcnow().isoformat(), 'database': 'sqlite', 'sizes': {}}
+
+    with app_module.app.app_context():
+        db = app_module.db
+        db.create_all()
+        user = app_module.User(email='bulk@example.com', is_premium=True)
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+        event.listen(db.engine, 'before_cursor_execute', count_query)
+        for cards in sizes:
+            orm = run(app_module, orm_persist, user_id, cards, args.iterations, args.warmup, query_counter)
+            bulk = run(app_module, bulk_persist, user_id, cards, args.iterations, args.warmup, query_counter)
+            speedup = round(orm['p50_ms'] / bulk['p50_ms'], 2) if bulk['p50_ms'] else None
+            results['sizes'][cards] = {'orm': orm, 'bulk': bulk, 'speedup_p50': speedup}
+            print(f"{cards:4} cards  orm p50 {orm['p50_ms']:8.2f}ms ({orm['queries']:3} queries)  "
+                  f"bulk p50 {bulk['p50_ms']:8.2f}ms ({bulk['queries']:3} queries)  x{speedup}")
+        event.remove(db.engine, 'before_cursor_execute', count_query)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
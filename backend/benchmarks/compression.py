@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Response compression benchmark: bytes on the wire and CPU cost per level.
+
+Seeds one large account (see endpoints.seed) and takes the identity bodies of
+``GET /api/decks`` and ``GET /api/decks/<id>``. For every gzip level (1-9)
+and brotli quality (0-11) it reports the compressed size, the ratio and the
+CPU time to compress each body. It then calls the routes through the app with
+each ``Accept-Encoding`` to show what the configured settings send.
+
+Usage:
+    python benchmarks/compression.py
+    python benchmarks/compression.py --decks 200 --cards 50 --repeat 10 --output compression.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GZIP_LEVELS = range(1, 10)
+BROTLI_QUALITIES = range(0, 12)
+
+
+def cpu_ms(fn, repeat):
+    """Median CPU milliseconds of fn() over ``repeat`` runs, and its last result"""
+    samples, result = [], None
+    for _ in range(repeat):
+        started = time.process_time()
+        result = fn()
+        samples.append((time.process_time() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def level_table(compressor_class, body, repeat, has_brotli):
+    """Size and CPU cost of every level for one body"""
+    rows = []
+    settings = [('gzip', level) for level in GZIP_LEVELS]
+    if has_brotli:
+        settings += [('br', quality) for quality in BROTLI_QUALITIES]
+
+    for encoding, level in settings:
+        compressor = compressor_class(gzip_level=level, brotli_quality=level)
+        one_shot_ms, compressed = cpu_ms(lambda: compressor.compress(body, encoding), repeat)
+        streamed_ms, _ = cpu_ms(lambda: b''.join(compressor.iter_compressed(_slices(body), encoding)), repeat)
+        rows.append({
+            'encoding': encoding,
+            'level': level,
+            'bytes': len(compressed),
+            'ratio': round(len(compressed) / len(body), 4),
+            'cpu_ms': round(one_shot_ms, 3),
+            'cpu_ms_streamed': round(streamed_ms, 3),
+            'mb_per_cpu_second': round(len(body) / 1e6 / (one_shot_ms / 1000), 1) if one_shot_ms else None
+        })
+    return rows
+
+
+def _slices(body, size=64 * 1024):
+    view = memoryview(body)
+    return (view[start:start + size] for start in range(0, len(view), size))
+
+
+def wire_table(client, url, encodings, repeat):
+    """What the app sends for each Accept-Encoding with the configured settings"""
+    rows = []
+    for accept in encodings:
+        timings, wire_bytes, encoding = [], 0, None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = client.get(url, headers={'Accept-Encoding': accept})
+            body = response.get_data()
+            timings.append((time.perf_counter() - started) * 1000)
+            wire_bytes, encoding = len(body), response.headers.get('Content-Encoding', 'identity')
+        rows.append({
+            'accept_encoding': accept or '(none)',
+            'content_encoding': encoding,
+            'bytes': wire_bytes,
+            'p50_ms': round(statistics.median(timings), 3)
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compressed size and CPU cost of deck payloads per level')
+    parser.add_argument('--decks', type=int, default=100)
+    parser.add_argument('--cards', type=int, default=40, help='Flashcards per deck')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (median is reported)')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='compression-'), 'compression.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ.pop('OPENROUTER_API_KEY', None)
+    os.environ['OPENROUTER_VALIDATE_ON_STARTUP'] = 'False'
+    sys.path.insert(0, BACKEND_DIR)
+
+    import logging
+    logging.disable(logging.ERROR)
+
+    import app as app_module
+    import compression
+    from endpoints import seed
+
+    with app_module.app.app_context():
+        app_module.db.create_all()
+        user_id = seed(app_module, 1, args.decks, args.cards, 0)
+        deck_id = app_module.Deck.query.filter_by(user_id=user_id).first().id
+
+    client = app_module.app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session['user_id'] = user_id
+
+    has_brotli = compression.brotli is not None
+    compressor = app_module.compressor
+    results = {
+        'created_at': datetime.utcnow().isoformat(),
+        'decks': args.decks,
+        'cards_per_deck': args.cards,
+        'settings': {
+            'min_size': compressor.min_size,
+            'gzip_level': compressor.gzip_level,
+            'brotli_quality': compressor.brotli_quality,
+            'stream_min_size': compressor.stream_min_size,
+            'available': list(compressor.encodings)
+        },
+        'payloads': {}
+    }
+
+    accepts = ['', 'gzip'] + (['br', 'br, gzip'] if has_brotli else [])
+    for name, url in (('deck list', '/api/decks'), ('deck detail', f'/api/decks/{deck_id}')):
+        body = client.get(url).get_data()
+        levels = level_table(compression.ResponseCompressor, body, args.repeat, has_brotli)
+        wire = wire_table(client, url, accepts, args.repeat)
+        results['payloads'][name] = {'url': url, 'identity_bytes': len(body), 'levels': levels, 'wire': wire}
+
+        print(f"\n{name}: {len(body):,} bytes uncompressed")
+        print(f"  {'encoding':8} {'level':>5} {'bytes':>10} {'ratio':>7} {'cpu ms':>8} {'streamed':>9} {'MB/cpu-s':>9}")
+        for row in levels:
+            print(f"  {row['encoding']:8} {row['level']:5} {row['bytes']:10,} {row['ratio']:7.3f} "
+                  f"{row['cpu_ms']:8.2f} {row['cpu_ms_streamed']:9.2f} {row['mb_per_cpu_second']:9}")
+        print('  on the wire with the configured settings:')
+        for row in wire:
+            print(f"  Accept-Encoding {row['accept_encoding']!r:12} -> {row['content_encoding']:8} "
+                  f"{row['bytes']:10,} bytes  p50 {row['p50_ms']:.2f}ms")
+
+    if not has_brotli:
+        print('\nbrotli is not installed; only gzip was measured (pip install brotli)')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
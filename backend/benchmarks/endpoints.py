@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+"""
+Endpoint latency benchmark with seeded synthetic data.
+
+Builds the app against a scratch SQLite database using the ``TestingConfig``
+settings, seeds users, decks, flashcards and completed study sessions, and
+then calls every route in ``app.py`` through the Flask test client. For each
+route it records latency percentiles and the number of SQL statements per
+request.
+
+OpenRouter and Paystack are replaced by an in-process transport adapter
+mounted on the shared HTTP client, so the real request path (rate limiter,
+retries, upstream metrics) still runs but nothing leaves the process.
+``--upstream-latency`` adds a fixed delay to every fake upstream call.
+
+Results are written as JSON. Passing ``--baseline`` compares against an
+earlier run and fails if any route's p95 latency or query count regressed
+beyond the threshold.
+
+Usage:
+    python benchmarks/endpoints.py --output bench.json
+    python benchmarks/endpoints.py --users 50 --decks 20 --cards 30 --iterations 50
+    python benchmarks/endpoints.py --baseline bench.json --threshold 0.25
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Opens the /api/debug/sql-profiles routes, which answer 404 without it
+SQL_PROFILING_TOKEN = 'benchmark-sql-profiling-token'
+PROFILE_HEADERS = {'X-SQL-Profile': SQL_PROFILING_TOKEN}
+
+NOTES_TEMPLATE = """
+Topic {n}: Photosynthesis is the process by which green plants convert light energy into chemical energy.
+Chlorophyll in the chloroplasts absorbs light, mostly in the blue and red wavelengths.
+The light-dependent reactions take place in the thylakoid membranes and produce ATP and NADPH.
+The Calvin cycle takes place in the stroma and uses ATP and NADPH to fix carbon dioxide into glucose.
+Stomata on the leaf surface let carbon dioxide in and release oxygen and water vapour.
+"""
+
+
+def distinct_notes(n):
+    """Notes whose every line starts with a random word, so no two calls yield near-duplicate questions"""
+    return '\n'.join(f'{uuid.uuid4().hex} {line}' for line in NOTES_TEMPLATE.format(n=n).strip().splitlines())
+
+
+def fake_questions(count):
+    # Random words keep every request's questions distinct, so near-duplicate
+    # screening keeps them and the deck is saved
+    return [{
+        'question': f'Synthetic question about {uuid.uuid4().hex} and {uuid.uuid4().hex} in photosynthesis?',
+        'options': ['Chlorophyll', 'Stroma', 'Thylakoid', 'Stomata'],
+        'answer': i % 4
+    } for i in range(count)]
+
+
+def make_fake_adapter(latency):
+    """Transport adapter answering OpenRouter and Paystack calls in-process"""
+    import requests
+    from requests.adapters import BaseAdapter
+
+    class FakeUpstreamAdapter(BaseAdapter):
+        # Paid-for user reported by transaction verification
+        user_id = None
+
+        def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+            if latency:
+                time.sleep(latency)
+
+            if 'openrouter.ai' in request.url:
+                status, body, content_type = self._openrouter(request)
+            else:
+                status, body, content_type = self._paystack(request)
+
+            response = requests.Response()
+            response.status_code = status
+            response.headers['Content-Type'] = content_type
+            response.raw = io.BytesIO(body)
+            response.url = request.url
+            response.request = request
+            response.encoding = 'utf-8'
+            return response
+
+        def close(self):
+            pass
+
+        @staticmethod
+        def _openrouter(request):
+            payload = json.loads(request.body or b'{}')
+            prompt = payload['messages'][0]['content']
+            count = int(prompt.split()[1]) if prompt.startswith('Create ') else 1
+            content = json.dumps(fake_questions(count))
+
+            if payload.get('stream'):
+                # Stream the array in small deltas like the real API
+                events = []
+                for start in range(0, len(content), 40):
+                    chunk = {'choices': [{'delta': {'content': content[start:start + 40]}}]}
+                    events.append(f"data: {json.dumps(chunk)}\n\n")
+                events.append('data: [DONE]\n\n')
+                return 200, ''.join(events).encode('utf-8'), 'text/event-stream'
+
+            body = {
+                'choices': [{'message': {'content': content}}],
+                'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(content) // 4}
+            }
+            return 200, json.dumps(body).encode('utf-8'), 'application/json'
+
+        def _paystack(self, request):
+            if '/transaction/initialize' in request.url:
+                reference = json.loads(request.body)['reference']
+                data = {
+                    'authorization_url': f'https://checkout.paystack.com/{reference}',
+                    'reference': reference,
+                    'access_code': uuid.uuid4().hex
+                }
+            elif '/transaction/verify/' in request.url:
+                data = {
+                    'status': 'success',
+                    'amount': 29900,
+                    'metadata': {'user_id': self.user_id, 'subscription_type': 'monthly'}
+                }
+            else:
+                data = []
+            return 200, json.dumps({'status': True, 'message': 'ok', 'data': data}).encode('utf-8'), \
+                'application/json'
+
+    return FakeUpstreamAdapter()
+
+
+def import_ndjson(n, cards):
+    """An export-format upload of one deck with ``cards`` cards"""
+    lines = [json.dumps({'record': 'deck', 'id': 'deck', 'title': f'Imported {n}'})]
+    lines += [json.dumps({'record': 'card', 'deck_id': 'deck', 'question': f'Imported question {n}-{c} {uuid.uuid4().hex}?',
+                          'type': 'short-answer', 'correct_answer': 'Answer'}) for c in range(cards)]
+    return '\n'.join(lines) + '\n'
+
+
+def import_csv(n, cards):
+    """A CSV upload of one deck with ``cards`` cards"""
+    rows = ['deck,question,correct_answer']
+    rows += [f'Imported {n},Imported question {n}-{c} {uuid.uuid4().hex}?,Answer' for c in range(cards)]
+    return '\n'.join(rows) + '\n'
+
+
+def seed(app_module, users, decks_per_user, cards_per_deck, sessions_per_user):
+    """Insert synthetic data; returns the id of the (premium) benchmark user"""
+    db = app_module.db
+    now = datetime.utcnow()
+    bench_user_id = None
+
+    for u in range(users):
+        user = app_module.User(email=f'bench{u}@example.com', is_premium=(u == 0), last_activity=now)
+        db.session.add(user)
+        db.session.flush()
+        bench_user_id = bench_user_id or user.id
+
+        deck_ids = []
+        for d in range(decks_per_user):
+            deck = app_module.Deck(
+                user_id=user.id,
+                title=f'Deck {d}',
+                original_notes=NOTES_TEMPLATE.format(n=d),
+                total_cards=cards_per_deck,
+                created_at=now - timedelta(hours=d)
+            )
+            db.session.add(deck)
+            db.session.flush()
+            deck_ids.append(deck.id)
+
+            for c in range(cards_per_deck):
+                db.session.add(app_module.Flashcard(
+                    deck_id=deck.id,
+                    question=f'Seeded question {c}?',
+                    question_type='multiple-choice',
+                    options=['A', 'B', 'C', 'D'],
+                    correct_answer='A',
+                    explanation='Seeded',
+                    times_studied=c % 5,
+                    times_correct=c % 3,
+                    mastery_level=(c % 10) / 10,
+                    next_review=now + timedelta(days=(c % 7) - 3)
+                ))
+
+        for s in range(sessions_per_user if deck_ids else 0):
+            started = now - timedelta(days=s % 30, minutes=20)
+            db.session.add(app_module.StudySession(
+                user_id=user.id,
+                deck_id=deck_ids[s % len(deck_ids)],
+                started_at=started,
+                completed_at=started + timedelta(minutes=15),
+                duration_minutes=15,
+                cards_studied=10,
+                cards_correct=7,
+                accuracy=70.0
+            ))
+
+        user.total_decks = decks_per_user
+        user.total_cards = decks_per_user * cards_per_deck
+        user.study_sessions = sessions_per_user
+        db.session.commit()
+
+    return bench_user_id
+
+
+def routes(state):
+    """
+    (name, prepare) pairs. ``prepare()`` runs outside the timed region and
+    returns (method, url, json_body), optionally followed by a dict of extra
+    test-client arguments (raw ``data``, ``content_type``, ``headers``).
+    """
+    counter = {'n': 0}
+
+    def next_n():
+        counter['n'] += 1
+        return counter['n']
+
+    def start_session(client):
+        response = client.post('/api/study-session', json={'deck_id': state['deck_id']})
+        return response.get_json()['session_id']
+
+    client = state['client']
+    return [
+        ('GET /api/health', lambda: ('GET', '/api/health', None)),
+        ('GET /api/ready', lambda: ('GET', '/api/ready', None)),
+        ('GET /metrics', lambda: ('GET', '/metrics', None)),
+        ('GET /api/debug/sql-profiles', lambda: (
+            'GET', '/api/debug/sql-profiles', None, {'headers': PROFILE_HEADERS})),
+        ('GET /api/debug/sql-profiles/<id>', lambda: (
+            'GET', f"/api/debug/sql-profiles/{state['profile_id']}", None, {'headers': PROFILE_HEADERS})),
+        ('POST /api/users', lambda: ('POST', '/api/users', {'email': f'new{next_n()}@example.com'})),
+        ('POST /api/generate-flashcards', lambda: (
+            'POST', '/api/generate-flashcards', {'notes': NOTES_TEMPLATE.format(n=f'ai-{next_n()}')})),
+        ('POST /api/generate-flashcards (local)', lambda: (
+            'POST', '/api/generate-flashcards', {'notes': distinct_notes(f'local-{next_n()}'),
+                                                 'engine': 'local'})),
+        ('POST /api/generate-flashcards/stream', lambda: (
+            'POST', '/api/generate-flashcards/stream', {'notes': NOTES_TEMPLATE.format(n=f'sse-{next_n()}')})),
+        ('POST /api/generate-flashcards?async=true', lambda: (
+            'POST', '/api/generate-flashcards?async=true', {'notes': NOTES_TEMPLATE.format(n=f'job-{next_n()}')})),
+        ('GET /api/jobs/<id>', lambda: ('GET', f"/api/jobs/{state['job_id']}", None)),
+        ('GET /api/decks', lambda: ('GET', '/api/decks', None)),
+        ('GET /api/decks (304)', lambda: (
+            'GET', '/api/decks', None, {'headers': {'If-None-Match': client.get('/api/decks').headers['ETag']}})),
+        ('GET /api/decks?fields=summary', lambda: ('GET', '/api/decks?fields=summary&limit=20', None)),
+        ('GET /api/decks/<id>', lambda: ('GET', f"/api/decks/{state['deck_id']}", None)),
+        ('PUT /api/decks/<id>', lambda: ('PUT', f"/api/decks/{state['deck_id']}", {'title': f'Deck {next_n()}'})),
+        ('POST /api/decks/<id>/deduplicate', lambda: (
+            'POST', f"/api/decks/{state['deck_id']}/deduplicate", {'scope': 'library', 'dry_run': True})),
+        ('POST /api/study-session', lambda: ('POST', '/api/study-session', {'deck_id': state['deck_id']})),
+        ('POST /api/study-session/<id>/reviews', lambda: (
+            'POST', f"/api/study-session/{start_session(client)}/reviews",
+            {'reviews': [{'card_id': card_id, 'is_correct': True} for card_id in state['card_ids'][:20]]})),
+        ('POST /api/study-session/<id>/complete', lambda: (
+            'POST', f"/api/study-session/{start_session(client)}/complete",
+            {'cards_studied': 10, 'cards_correct': 8, 'accuracy': 80.0})),
+        ('POST /api/cards/<id>/study', lambda: (
+            'POST', f"/api/cards/{state['card_ids'][next_n() % len(state['card_ids'])]}/study",
+            {'is_correct': True, 'difficulty': 'medium'})),
+        ('GET /api/review/due', lambda: ('GET', '/api/review/due?limit=20', None)),
+        ('GET /api/user/stats', lambda: ('GET', '/api/user/stats', None)),
+        ('GET /api/search', lambda: ('GET', '/api/search?q=photosynthesis%20light', None)),
+        ('GET /api/export', lambda: ('GET', '/api/export', None)),
+        ('POST /api/import (ndjson)', lambda: (
+            'POST', '/api/import', None,
+            {'data': import_ndjson(next_n(), 20), 'content_type': 'application/x-ndjson'})),
+        ('POST /api/import (csv)', lambda: (
+            'POST', '/api/import', None, {'data': import_csv(next_n(), 20), 'content_type': 'text/csv'})),
+        ('POST /api/premium/upgrade', lambda: ('POST', '/api/premium/upgrade', {'subscription_type': 'monthly'})),
+        ('GET /api/payment/callback', lambda: ('GET', f'/api/payment/callback?reference=bench-{next_n()}', None)),
+        ('POST /api/payment/verify', lambda: ('POST', '/api/payment/verify', {'reference': f'bench-{next_n()}'})),
+        ('GET /api/test-paystack', lambda: ('GET', '/api/test-paystack', None)),
+        ('GET /payment/success', lambda: ('GET', '/payment/success', None)),
+        ('GET /payment/failed', lambda: ('GET', '/payment/failed', None)),
+    ]
+
+
+# Maximum SQL statements per request, independent of how much data is seeded.
+# --check-budgets fails on any route above its budget and lists the
+# statements (with call sites) so the N+1 pattern is easy to find.
+QUERY_BUDGETS = {
+    'GET /api/health': 1,
+    'GET /api/ready': 2,
+    'GET /metrics': 0,
+    'GET /api/debug/sql-profiles': 0,
+    'GET /api/debug/sql-profiles/<id>': 0,
+    'GET /api/decks': 3,
+    'GET /api/decks (304)': 1,  # the user's deck list version
+    'GET /api/decks?fields=summary': 3,
+    'GET /api/decks/<id>': 3,
+    'PUT /api/decks/<id>': 3,
+    'POST /api/decks/<id>/deduplicate': 5,
+    'POST /api/study-session': 3,
+    'POST /api/study-session/<id>/reviews': 6,
+    'POST /api/study-session/<id>/complete': 10,
+    'POST /api/cards/<id>/study': 4,
+    'GET /api/review/due': 1,
+    'GET /api/user/stats': 2,
+    'GET /api/search': 1,
+    'GET /api/export': 2,  # per page of decks: the page, then its cards
+    # Cards are inserted in batches, so this holds for any upload up to IMPORT_BATCH_SIZE cards
+    'POST /api/import (ndjson)': 8,
+    'POST /api/import (csv)': 8,
+}
+
+# Routes that switch the caller's session to a new user run on their own client
+ANONYMOUS_ROUTES = {'POST /api/users'}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def send(client, prepared):
+    """Issue one request from a ``prepare()`` result"""
+    method, url, body, *extra = prepared
+    kwargs = dict(extra[0]) if extra else {}
+    if body is not None:
+        kwargs['json'] = body
+    return client.open(url, method=method, **kwargs)
+
+
+def measure(client, prepare, iterations, warmup, query_counter):
+    latencies, queries, statuses = [], [], {}
+
+    for i in range(warmup + iterations):
+        prepared = prepare()
+        query_counter['n'] = 0
+        started = time.perf_counter()
+        response = send(client, prepared)
+        response.get_data()  # drain streamed bodies inside the timed region
+        elapsed = time.perf_counter() - started
+
+        if i < warmup:
+            continue
+        latencies.append(elapsed * 1000)
+        queries.append(query_counter['n'])
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    return {
+        'iterations': iterations,
+        'status_codes': statuses,
+        'latency_ms': {
+            'mean': round(statistics.mean(latencies), 3),
+            'p50': round(percentile(latencies, 50), 3),
+            'p90': round(percentile(latencies, 90), 3),
+            'p95': round(percentile(latencies, 95), 3),
+            'p99': round(percentile(latencies, 99), 3),
+            'max': round(max(latencies), 3)
+        },
+        'queries': {
+            'mean': round(statistics.mean(queries), 2),
+            'max': max(queries)
+        }
+    }
+
+
+def check_budgets(profiler, client, route_list, budgets):
+    """Run each budgeted route once inside max_queries(); return failure messages"""
+    from sql_profiler import TooManyQueries
+
+    failures = []
+    for name, prepare in route_list:
+        if name not in budgets:
+            continue
+        prepared = prepare()
+        try:
+            with profiler.max_queries(budgets[name], label=name):
+                send(client, prepared).get_data()  # streamed bodies query as they are read
+        except TooManyQueries as e:
+            failures.append(str(e))
+    return failures
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Return regression messages for routes slower or chattier than the baseline"""
+    regressions = []
+    for name, current in results['routes'].items():
+        previous = baseline.get('routes', {}).get(name)
+        if not previous:
+            continue
+
+        before, after = previous['latency_ms']['p95'], current['latency_ms']['p95']
+        if after > before * (1 + threshold) and after - before > min_delta_ms:
+            regressions.append(f"{name}: p95 {before:.2f}ms -> {after:.2f}ms")
+
+        if current['queries']['max'] > previous['queries']['max']:
+            regressions.append(f"{name}: queries {previous['queries']['max']} -> {current['queries']['max']}")
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every API route against seeded data')
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--decks', type=int, default=10, help='Decks per user')
+    parser.add_argument('--cards', type=int, default=20, help='Flashcards per deck')
+    parser.add_argument('--sessions', type=int, default=30, help='Completed study sessions per user')
+    parser.add_argument('--iterations', type=int, default=30, help='Timed requests per route')
+    parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per route')
+    parser.add_argument('--upstream-latency', type=float, default=0.0,
+                        help='Seconds added to every fake OpenRouter/Paystack call')
+    parser.add_argument('--route', action='append', help='Only run routes whose name contains this text')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--baseline', help='Earlier results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed fractional p95 slowdown against the baseline')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='Ignore p95 slowdowns smaller than this (timer noise)')
+    parser.add_argument('--check-budgets', action='store_true',
+                        help='Fail if a route runs more SQL statements than its QUERY_BUDGETS entry')
+    args = parser.parse_args()
+
+    # The app configures itself at import time, so set the environment first.
+    # TestingConfig's in-memory SQLite cannot be shared between pooled
+    # connections, so a scratch file is used instead.
+    db_path = os.path.join(tempfile.mkdtemp(prefix='bench-'), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['OPENROUTER_API_KEY'] = 'sk-or-benchmark-dummy-token-0000000000'
+    os.environ['OPENROUTER_VALIDATE_ON_STARTUP'] = 'False'
+    os.environ['OPENROUTER_REQUESTS_PER_MINUTE'] = '1000000'
+    os.environ['OPENROUTER_BURST'] = '1000000'
+    os.environ['PAYSTACK_SECRET_KEY'] = 'sk_test_benchmark'
+    os.environ['SQL_PROFILING_TOKEN'] = SQL_PROFILING_TOKEN
+    sys.path.insert(0, BACKEND_DIR)
+
+    import logging
+    logging.disable(logging.INFO)
+
+    import app as app_module
+    from config import TestingConfig
+    from sqlalchemy import event
+
+    app = app_module.app
+    app.config['TESTING'] = TestingConfig.TESTING
+
+    adapter = make_fake_adapter(args.upstream_latency)
+    app_module.http_client.session.mount('https://openrouter.ai/', adapter)
+    app_module.http_client.session.mount('https://api.paystack.co/', adapter)
+
+    with app.app_context():
+        app_module.db.create_all()
+        seed_started = time.perf_counter()
+        bench_user_id = seed(app_module, args.users, args.decks, args.cards, args.sessions)
+        seed_seconds = time.perf_counter() - seed_started
+        adapter.user_id = bench_user_id
+        engine = app_module.db.engine
+
+        deck = app_module.Deck.query.filter_by(user_id=bench_user_id).first()
+        if deck is None:
+            parser.error('--decks must be at least 1')
+        state = {
+            'deck_id': deck.id,
+            'card_ids': [card.id for card in deck.cards]
+        }
+
+    query_counter = {'n': 0}
+    request_thread = threading.get_ident()
+
+    def count_query(*_):
+        # Background jobs (generation, near-duplicate indexing) share the engine
+        if threading.get_ident() == request_thread:
+            query_counter['n'] += 1
+
+    event.listen(engine, 'before_cursor_execute', count_query)
+
+    client = app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session['user_id'] = bench_user_id
+    state['client'] = client
+
+    job = client.post('/api/generate-flashcards?async=true', json={'notes': NOTES_TEMPLATE.format(n='job-seed')})
+    state['job_id'] = job.get_json()['job_id']
+
+    # A profiled request for the debug report routes to render
+    client.get('/api/decks', headers=PROFILE_HEADERS)
+    profiles = client.get('/api/debug/sql-profiles', headers=PROFILE_HEADERS).get_json()['profiles']
+    state['profile_id'] = profiles[0]['id']
+
+    results = {
+        'meta': {
+            'revision': git_revision(),
+            'created_at': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'database': 'sqlite',
+            'seed': {
+                'users': args.users,
+                'decks_per_user': args.decks,
+                'cards_per_deck': args.cards,
+                'sessions_per_user': args.sessions,
+                'seconds': round(seed_seconds, 3)
+            },
+            'iterations': args.iterations,
+            'warmup': args.warmup,
+            'upstream_latency_seconds': args.upstream_latency
+        },
+        'routes': {}
+    }
+
+    for name, prepare in routes(state):
+        if args.route and not any(text in name for text in args.route):
+            continue
+        route_client = app.test_client() if name in ANONYMOUS_ROUTES else client
+        results['routes'][name] = measure(route_client, prepare, args.iterations, args.warmup, query_counter)
+        summary = results['routes'][name]
+        print(f"{name:45} p50 {summary['latency_ms']['p50']:8.2f}ms  p95 {summary['latency_ms']['p95']:8.2f}ms  "
+              f"queries {summary['queries']['mean']:6.1f}  {summary['status_codes']}")
+
+    budget_failures = []
+    if args.check_budgets:
+        selected = [(name, prepare) for name, prepare in routes(state)
+                    if not args.route or any(text in name for text in args.route)]
+        budgets = dict(QUERY_BUDGETS)
+        with app.app_context():
+            decks = app_module.Deck.query.filter_by(user_id=bench_user_id).count()
+        budgets['GET /api/export'] *= decks // app_module.EXPORT_DECK_PAGE + 1
+        budget_failures = check_budgets(app_module.sql_profiler, client, selected, budgets)
+        for failure in budget_failures:
+            print(f"❌ {failure}", file=sys.stderr)
+        if not budget_failures:
+            print('✅ Every route is within its query budget')
+
+    app_module.job_runner.shutdown()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if budget_failures:
+        return 1
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold, args.min_delta_ms)
+        if regressions:
+            print('❌ Regressions against the baseline:', file=sys.stderr)
+            for line in regressions:
+                print(f"   {line}", file=sys.stderr)
+            return 1
+        print(f"✅ No route regressed by more than {args.threshold:.0%} against the baseline")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
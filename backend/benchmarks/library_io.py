@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Library export/import benchmark: throughput and peak memory.
+
+For each library size, streams an NDJSON upload of that many cards into
+``POST /api/import``, then reads ``GET /api/export`` back chunk by chunk.
+Neither side of the client ever holds the whole body. Peak Python memory
+(tracemalloc) is recorded for each request. It should stay roughly flat as
+the library grows, because both directions work in batches.
+
+Usage:
+    python benchmarks/library_io.py
+    python benchmarks/library_io.py --cards 1000 --cards 20000 --cards-per-deck 100
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def upload_lines(cards, cards_per_deck):
+    """NDJSON upload of ``cards`` cards, generated lazily"""
+    yield json.dumps({'record': 'export', 'version': 1}) + '\n'
+    for n in range(cards):
+        if n % cards_per_deck == 0:
+            deck = n // cards_per_deck
+            yield json.dumps({'record': 'deck', 'id': f'deck-{deck}', 'title': f'Imported deck {deck}',
+                              'original_notes': 'Imported for the benchmark'}) + '\n'
+        yield json.dumps({
+            'record': 'card',
+            'deck_id': f'deck-{n // cards_per_deck}',
+            'question': f'Imported question {n} about cell biology?',
+            'type': 'multiple-choice',
+            'options': ['Mitochondria', 'Nucleus', 'Ribosome', 'Golgi'],
+            'correct_answer': 'Mitochondria',
+            'explanation': 'The mitochondria produce most of the cell\'s ATP.',
+            'topic': 'biology'
+        }) + '\n'
+
+
+class GeneratedStream(io.RawIOBase):
+    """Readable file over a line generator, so the upload is never built in memory"""
+
+    def __init__(self, lines):
+        self._lines = lines
+        self._buffer = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        while len(self._buffer) < len(target):
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line.encode('utf-8')
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def measure(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import/export throughput and peak memory by library size')
+    parser.add_argument('--cards', type=int, action='append', help='Cards per run (repeatable)')
+    parser.add_argument('--cards-per-deck', type=int, default=50)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+    sizes = args.cards or [1000, 5000, 20000]
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='library-io-'), 'library.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ.pop('OPENROUTER_API_KEY', None)
+    os.environ['OPENROUTER_VALIDATE_ON_STARTUP'] = 'False'
+    os.environ['IMPORT_MAX_CARDS'] = str(max(sizes))
+    # Background near-duplicate backfills would outlive each run's tables
+    os.environ['NEAR_DUPLICATE_DETECTION'] = 'False'
+    sys.path.insert(0, BACKEND_DIR)
+
+    import logging
+    logging.disable(logging.INFO)
+
+    import app as app_module
+
+    results = []
+    for cards in sizes:
+        with app_module.app.app_context():
+            app_module.db.drop_all()
+            app_module.db.create_all()
+            user = app_module.User(email=f'library{cards}@example.com', is_premium=True)
+            app_module.db.session.add(user)
+            app_module.db.session.commit()
+            user_id = user.id
+
+        client = app_module.app.test_client()
+        with client.session_transaction() as flask_session:
+            flask_session['user_id'] = user_id
+
+        content_length = sum(len(line.encode('utf-8')) for line in upload_lines(cards, args.cards_per_deck))
+
+        def run_import():
+            stream = GeneratedStream(upload_lines(cards, args.cards_per_deck))
+            # Bypass the test client's body handling, which needs a seekable stream
+            response = client.post('/api/import', content_type='application/x-ndjson', environ_overrides={
+                'wsgi.input': stream,
+                'CONTENT_LENGTH': str(content_length)
+            })
+            if response.status_code != 201:
+                raise RuntimeError(f'import failed: {response.get_data(as_text=True)}')
+            return response.get_json()['cards_created']
+
+        def run_export():
+            response = client.get('/api/export', buffered=False)
+            size, lines = 0, 0
+            for chunk in response.response:
+                size += len(chunk)
+                lines += chunk.count(b'\n')
+            response.close()
+            return size, lines
+
+        imported, import_seconds, import_peak = measure(run_import)
+        (export_bytes, export_lines), export_seconds, export_peak = measure(run_export)
+
+        row = {
+            'cards': cards,
+            'upload_bytes': content_length,
+            'import_seconds': round(import_seconds, 3),
+            'import_cards_per_second': round(imported / import_seconds),
+            'import_peak_mb': round(import_peak / 1e6, 2),
+            'export_bytes': export_bytes,
+            'export_lines': export_lines,
+            'export_seconds': round(export_seconds, 3),
+            'export_peak_mb': round(export_peak / 1e6, 2)
+        }
+        results.append(row)
+        print(f"{cards:7,} cards  import {row['import_seconds']:7.2f}s ({row['import_cards_per_second']:,}/s, "
+              f"peak {row['import_peak_mb']:.2f} MB)  export {row['export_seconds']:7.2f}s "
+              f"({export_bytes / 1e6:.1f} MB, peak {row['export_peak_mb']:.2f} MB)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
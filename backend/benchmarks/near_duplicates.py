@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection benchmark: lookup cost and accuracy by library size.
+
+For each library size, seeds one account with that many distinct synthetic
+questions through ``POST /api/import``, then waits for the background
+backfill that indexes them (both are timed). It then screens a batch of
+generated questions against the library, in the same way a new deck is
+screened:
+
+- rewordings of library questions (reordered, inflected, one word swapped),
+  which should be dropped;
+- fresh questions, which should be kept.
+
+Each batch is timed with the LSH index and with a brute-force pairwise scan
+of the library, and the number of cards compared exactly is reported. With
+the index, both should stay roughly flat as the library grows. Precision
+and recall are measured against the exact Jaccard similarity.
+
+Usage:
+    python benchmarks/near_duplicates.py
+    python benchmarks/near_duplicates.py --cards 1000 --cards 50000 --batch 40
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TEMPLATES = [
+    'What is the role of the {a} in the {b} of {c}?',
+    'How does {a} affect {b} during {c}?',
+    'Which {a} is responsible for {b} in {c}?',
+    'Why does the {a} produce {b} when {c} increases?',
+    'Explain how {a} and {b} interact in {c}.',
+    'What happens to {a} if {b} is removed from {c}?',
+]
+SUFFIXES = {'produce': 'produced', 'affect': 'affects', 'increases': 'increased', 'interact': 'interacts'}
+
+
+def vocabulary(rng, size=4000):
+    syllables = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ze', 'pa', 'do', 'gri', 'ster', 'lin', 'mor']
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def question(rng, words):
+    return rng.choice(TEMPLATES).format(a=rng.choice(words), b=rng.choice(words), c=rng.choice(words))
+
+
+def reword(rng, text, words):
+    """A near-duplicate: one of reorder, inflect or swap a word"""
+    tokens = text.rstrip('?.').split()
+    change = rng.choice(('reorder', 'inflect', 'swap'))
+    if change == 'reorder':
+        return 'In ' + tokens[-1] + ', ' + ' '.join(tokens[:-2]).lower() + '?'
+    if change == 'inflect' and any(token in SUFFIXES for token in tokens):
+        return ' '.join(SUFFIXES.get(token, token) for token in tokens) + '?'
+    short = [n for n, token in enumerate(tokens) if len(token) <= 4]
+    if short:
+        tokens[rng.choice(short)] = rng.choice(('a', 'an', 'this', 'that'))
+    return ' '.join(tokens) + '?'
+
+
+def seed(client, library):
+    lines = [json.dumps({'record': 'deck', 'id': 'library', 'title': 'Library'})]
+    lines += [json.dumps({'record': 'card', 'deck_id': 'library', 'question': text, 'type': 'short-answer',
+                          'correct_answer': 'answer'}) for text in library]
+    body = ('\n'.join(lines) + '\n').encode('utf-8')
+    started = time.perf_counter()
+    response = client.post('/api/import', data=io.BytesIO(body), content_type='application/x-ndjson')
+    if response.status_code != 201:
+        raise RuntimeError(f'import failed: {response.get_data(as_text=True)}')
+    return time.perf_counter() - started
+
+
+def brute_force(shingled_library, batch, threshold, near_duplicates):
+    started = time.perf_counter()
+    dropped = []
+    for text in batch:
+        grams = near_duplicates.shingles(text)
+        dropped.append(any(near_duplicates.jaccard(grams, other) >= threshold for other in shingled_library))
+    return dropped, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Near-duplicate screening cost and accuracy by library size')
+    parser.add_argument('--cards', type=int, action='append', help='Library size (repeatable)')
+    parser.add_argument('--batch', type=int, default=40, help='Generated questions per screened batch')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+    sizes = args.cards or [1000, 10000, 50000]
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='near-duplicates-'), 'near_duplicates.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ.pop('OPENROUTER_API_KEY', None)
+    os.environ['OPENROUTER_VALIDATE_ON_STARTUP'] = 'False'
+    os.environ['IMPORT_MAX_CARDS'] = str(max(sizes))
+    sys.path.insert(0, BACKEND_DIR)
+
+    import logging
+    logging.disable(logging.INFO)
+
+    import app as app_module
+    import near_duplicates
+
+    index = app_module.near_duplicate_index
+    results = []
+    for cards in sizes:
+        rng = random.Random(cards)
+        words = vocabulary(rng)
+        library = list(dict.fromkeys(question(rng, words) for _ in range(cards)))
+
+        with app_module.app.app_context():
+            app_module.db.drop_all()
+            app_module.db.create_all()
+            user = app_module.User(email=f'dedup{cards}@example.com', is_premium=True)
+            app_module.db.session.add(user)
+            app_module.db.session.commit()
+            user_id = user.id
+
+        client = app_module.app.test_client()
+        with client.session_transaction() as flask_session:
+            flask_session['user_id'] = user_id
+        import_seconds = seed(client, library)
+        started = time.perf_counter()
+        while True:
+            with app_module.app.app_context():
+                if index.is_indexed(user_id):
+                    break
+            time.sleep(0.05)
+        backfill_seconds = time.perf_counter() - started
+
+        half = args.batch // 2
+        batch = [reword(rng, text, words) for text in rng.sample(library, half)]
+        batch += [question(rng, words) for _ in range(args.batch - half)]
+        shingled = [near_duplicates.shingles(text) for text in library]
+        expected, brute_seconds = brute_force(shingled, batch, index.threshold, near_duplicates)
+
+        with app_module.app.app_context():
+            compared_before = index.stats()['compared']
+            started = time.perf_counter()
+            screening = index.screen(user_id, [{'question': text} for text in batch])
+            lsh_seconds = time.perf_counter() - started
+            compared = index.stats()['compared'] - compared_before
+            app_module.db.session.rollback()
+
+        dropped_texts = {item['question'] for item in screening.duplicates}
+        dropped = [text in dropped_texts for text in batch]
+        true_positives = sum(1 for got, want in zip(dropped, expected) if got and want)
+        row = {
+            'cards': len(library),
+            'import_seconds': round(import_seconds, 3),
+            'backfill_seconds': round(backfill_seconds, 3),
+            'batch': len(batch),
+            'lsh_ms': round(lsh_seconds * 1000, 2),
+            'brute_force_ms': round(brute_seconds * 1000, 2),
+            'compared_per_question': round(compared / len(batch), 1),
+            'duplicates_expected': sum(expected),
+            'duplicates_dropped': sum(dropped),
+            'recall': round(true_positives / sum(expected), 4) if any(expected) else None,
+            'precision': round(true_positives / sum(dropped), 4) if any(dropped) else None
+        }
+        results.append(row)
+        print(f"{row['cards']:7,} cards  import {row['import_seconds']:6.2f}s  "
+              f"backfill {row['backfill_seconds']:6.2f}s  screen {row['batch']} questions: "
+              f"LSH {row['lsh_ms']:7.2f}ms ({row['compared_per_question']} compared each) vs "
+              f"pairwise {row['brute_force_ms']:9.2f}ms  recall {row['recall']}  precision {row['precision']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'created_at': datetime.utcnow().isoformat(), 'runs': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression check.
+
+Seeds a throwaway SQLite database, drives every read/write endpoint through
+the Flask test client while recording each SQL statement, then runs
+``EXPLAIN QUERY PLAN`` on every distinct SELECT/UPDATE/DELETE and fails when
+any of them reads a table with a full scan instead of an index.
+
+Generation uses the offline local engine, so no network access is needed.
+
+Usage:
+    python benchmarks/query_plans.py
+    python benchmarks/query_plans.py --verbose --output plans.json
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Full scans that are expected: tiny tables or statements with no WHERE clause
+ALLOWED_SCANS = {
+    'SELECT 1',
+}
+
+NOTES = """
+Photosynthesis is the process by which green plants convert light energy into chemical energy.
+Chlorophyll in the chloroplasts absorbs light, mostly in the blue and red wavelengths.
+The light-dependent reactions take place in the thylakoid membranes and produce ATP and NADPH.
+The Calvin cycle takes place in the stroma and uses ATP and NADPH to fix carbon dioxide into glucose.
+Stomata on the leaf surface let carbon dioxide in and release oxygen and water vapour.
+Chlorophyll gives plants their green colour, and the chloroplasts are most common in leaf cells.
+Glucose made by photosynthesis is stored as starch or used in respiration to release energy.
+"""
+
+# Full-text (FTS5 MATCH) lookups show up as a SCAN of the virtual table with an index
+_FULL_SCAN_RE = re.compile(r'^SCAN (\w+)\b(?! USING| VIRTUAL TABLE INDEX \d+:M)')
+_SUBQUERY_RE = re.compile(r'^(?:MATERIALIZE|CO-ROUTINE) (\w+)')
+
+
+def collect_statements(app_module):
+    """Exercise the API, returning {sql: (params, endpoint)} for every statement run"""
+    from sqlalchemy import event
+
+    app, db = app_module.app, app_module.db
+    statements = {}
+    current = {'endpoint': None}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')) and not executemany:
+            statements.setdefault(statement, (parameters, current['endpoint']))
+
+    with app.app_context():
+        db.create_all()
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+
+    client = app.test_client()
+
+    def call(method, url, **kwargs):
+        current['endpoint'] = f"{method} {url.split('?')[0]}"
+        response = client.open(url, method=method, **kwargs)
+        if response.status_code >= 500 and response.status_code != 503:
+            raise RuntimeError(f"{method} {url} failed with {response.status_code}: {response.get_data(as_text=True)}")
+        return response
+
+    try:
+        call('GET', '/api/health')
+        call('GET', '/api/ready')
+        call('POST', '/api/users', json={'email': 'plans@example.com'})
+
+        generated = call('POST', '/api/generate-flashcards', json={'notes': NOTES, 'engine': 'local'}).get_json()
+        deck_id = generated['deck_id']
+        card_ids = [card['id'] for card in generated['cards']]
+        call('POST', '/api/generate-flashcards', json={'notes': NOTES + ' Plants.', 'engine': 'local'})
+
+        call('GET', '/api/decks')
+        first_page = call('GET', '/api/decks?limit=1&fields=summary').get_json()
+        call('GET', f"/api/decks?limit=1&fields=summary&cursor={first_page['next_cursor']}")
+        call('GET', f'/api/decks/{deck_id}')
+        call('PUT', f'/api/decks/{deck_id}', json={'title': 'Photosynthesis'})
+
+        session_id = call('POST', '/api/study-session', json={'deck_id': deck_id}).get_json()['session_id']
+        call('POST', f'/api/study-session/{session_id}/reviews', json={
+            'reviews': [{'card_id': card_id, 'is_correct': True} for card_id in card_ids]
+        })
+        call('POST', f'/api/cards/{card_ids[0]}/study', json={'is_correct': False})
+        call('POST', f'/api/study-session/{session_id}/complete', json={'accuracy': 80.0})
+
+        call('GET', '/api/review/due?limit=10')
+        call('GET', '/api/user/stats')
+
+        call('GET', '/api/search?q=chlorophyll%20light')
+        call('GET', '/api/search?q=photo&limit=1')
+
+        exported = call('GET', '/api/export').get_data()
+        imported = call('POST', '/api/import', data=exported, content_type='application/x-ndjson').get_json()
+        copy_id = imported['deck_ids'][0]
+        # Library scope answers 503 until the background backfill has indexed the user
+        for _ in range(100):
+            if call('POST', f'/api/decks/{copy_id}/deduplicate', json={'scope': 'library', 'dry_run': True}).status_code != 503:
+                break
+            time.sleep(0.1)
+        call('POST', f'/api/decks/{copy_id}/deduplicate', json={'scope': 'library'})
+        call('POST', f'/api/decks/{copy_id}/deduplicate')
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+    return statements
+
+
+def explain(app_module, statements):
+    """EXPLAIN QUERY PLAN each statement; return per-statement results"""
+    app, db = app_module.app, app_module.db
+    results = []
+
+    with app.app_context():
+        raw = db.engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            for sql, (parameters, endpoint) in statements.items():
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', parameters or ())
+                plan = [row[-1] for row in cursor.fetchall()]
+                # Reading back a materialized subquery is not a table scan
+                subqueries = {match.group(1) for match in map(_SUBQUERY_RE.match, plan) if match}
+                scans = [step for step in plan
+                         if _FULL_SCAN_RE.match(step) and _FULL_SCAN_RE.match(step).group(1) not in subqueries]
+                allowed = ' '.join(sql.split()) in ALLOWED_SCANS
+                results.append({
+                    'endpoint': endpoint,
+                    'sql': ' '.join(sql.split()),
+                    'plan': plan,
+                    'full_scans': scans,
+                    'ok': allowed or not scans
+                })
+        finally:
+            raw.close()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fail when an endpoint query needs a full table scan')
+    parser.add_argument('--verbose', action='store_true', help='Print the plan of every statement')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='query-plans-'), 'plans.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ.pop('OPENROUTER_API_KEY', None)
+    os.environ['OPENROUTER_VALIDATE_ON_STARTUP'] = 'False'
+    sys.path.insert(0, BACKEND_DIR)
+
+    import app as app_module
+
+    results = explain(app_module, collect_statements(app_module))
+    failures = [result for result in results if not result['ok']]
+
+    for result in results:
+        if args.verbose or not result['ok']:
+            marker = '✅' if result['ok'] else '❌'
+            print(f"{marker} [{result['endpoint']}] {result['sql']}")
+            for step in result['plan']:
+                print(f"      {step}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if failures:
+        print(f"❌ {len(failures)} of {len(results)} statements use a full table scan", file=sys.stderr)
+        return 1
+
+    print(f"✅ All {len(results)} statements use indexes")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Library search benchmark: ``GET /api/search`` latency on a large account.
+
+Seeds one account with ``--cards`` cards (plus other accounts sharing the
+same vocabulary, so the index holds more than the searched user's rows).
+The rows go in with bulk INSERTs, which also checks that the index keeps up
+with writes that bypass the ORM. It then times queries of different
+selectivity: a rare word, a common word, a word in almost every card, two
+words, and short prefixes as typed in a search box.
+
+Exits non-zero when any query's p95 exceeds ``--budget-ms``.
+
+Usage:
+    python benchmarks/search.py
+    python benchmarks/search.py --cards 20000 --other-users 5 --budget-ms 50
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Words planted at a known share of cards; the rest is Zipf-distributed filler
+PLANTED = {'mitochondria': 0.005, 'photosynthesis': 0.05, 'cell': 0.5, 'energy': 0.9}
+
+QUERIES = {
+    'rare word': 'mitochondria',
+    'common word': 'photosynthesis',
+    'very common word': 'energy',
+    'two words': 'cell photosynthesis',
+    'prefix (3 chars)': 'pho',
+    'prefix, common': 'ene',
+    'prefix, filler': 'kal',
+    'single letter': 'm',
+    'no match': 'quasar',
+}
+
+
+def vocabulary(rng, size=3000):
+    syllables = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ze', 'pa', 'do', 'gri', 'ster', 'lin', 'mor']
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def sentence(rng, words, weights, length):
+    text = rng.choices(words, weights=weights, k=length)
+    for word, share in PLANTED.items():
+        if rng.random() < share:
+            text.insert(rng.randrange(len(text) + 1), word)
+    return ' '.join(text)
+
+
+def seed_user(app_module, rng, words, weights, email, cards, cards_per_deck):
+    from bulk_insert import insert_rows
+
+    db, Deck, Flashcard = app_module.db, app_module.Deck, app_module.Flashcard
+    now = datetime.utcnow()
+    user = app_module.User(email=email, is_premium=True)
+    db.session.add(user)
+    db.session.flush()
+
+    for start in range(0, cards, cards_per_deck):
+        deck_id = str(uuid.uuid4())
+        insert_rows(db.session, Deck.__table__, [{
+            'id': deck_id, 'user_id': user.id, 'title': sentence(rng, words, weights, 4),
+            'original_notes': sentence(rng, words, weights, 200), 'total_cards': cards_per_deck,
+            'created_at': now, 'updated_at': now
+        }])
+        insert_rows(db.session, Flashcard.__table__, [{
+            'id': str(uuid.uuid4()), 'deck_id': deck_id, 'question': sentence(rng, words, weights, 12) + '?',
+            'question_type': 'short-answer', 'options': [], 'correct_answer': rng.choice(words),
+            'explanation': sentence(rng, words, weights, 25), 'topic': rng.choice(words[:50]),
+            'created_at': now, 'next_review': now
+        } for _ in range(start, min(cards, start + cards_per_deck))])
+    db.session.commit()
+    return user.id
+
+
+def time_query(client, query, iterations, warmup):
+    timings, result = [], None
+    for i in range(warmup + iterations):
+        started = time.perf_counter()
+        response = client.get('/api/search', query_string={'q': query, 'limit': 20})
+        elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code != 200:
+            raise RuntimeError(f'{query!r} returned {response.status_code}: {response.get_data(as_text=True)}')
+        result = response.get_json()
+        if i >= warmup:
+            timings.append(elapsed)
+    timings.sort()
+    return {
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        'results': len(result['results']),
+        'more': result['next_cursor'] is not None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search latency for a user with a large library')
+    parser.add_argument('--cards', type=int, default=10000, help='Cards of the searched user')
+    parser.add_argument('--cards-per-deck', type=int, default=50)
+    parser.add_argument('--other-users', type=int, default=3, help='Accounts of the same size sharing the index')
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--budget-ms', type=float, default=50.0, help='Fail when a query p95 exceeds this')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='search-'), 'search.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ.pop('OPENROUTER_API_KEY', None)
+    os.environ['OPENROUTER_VALIDATE_ON_STARTUP'] = 'False'
+    sys.path.insert(0, BACKEND_DIR)
+
+    import logging
+    logging.disable(logging.INFO)
+
+    import app as app_module
+
+    rng = random.Random(42)
+    words = vocabulary(rng)
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+
+    started = time.perf_counter()
+    with app_module.app.app_context():
+        app_module.db.create_all()
+        user_id = seed_user(app_module, rng, words, weights, 'search@example.com', args.cards, args.cards_per_deck)
+        for n in range(args.other_users):
+            seed_user(app_module, rng, words, weights, f'other{n}@example.com', args.cards, args.cards_per_deck)
+    total_cards = args.cards * (args.other_users + 1)
+    print(f'Seeded {total_cards:,} cards ({args.cards:,} searched) in {time.perf_counter() - started:.1f}s')
+
+    client = app_module.app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session['user_id'] = user_id
+
+    results = {
+        'created_at': datetime.utcnow().isoformat(),
+        'cards': args.cards,
+        'indexed_cards': total_cards,
+        'budget_ms': args.budget_ms,
+        'queries': {}
+    }
+    over_budget = []
+    for name, query in QUERIES.items():
+        row = time_query(client, query, args.iterations, args.warmup)
+        results['queries'][name] = dict(row, q=query)
+        flag = '' if row['p95_ms'] <= args.budget_ms else '  OVER BUDGET'
+        if flag:
+            over_budget.append(name)
+        print(f"{name:18} q={query!r:24} p50 {row['p50_ms']:7.2f}ms  p95 {row['p95_ms']:7.2f}ms  "
+              f"{row['results']} results{' (more)' if row['more'] else ''}{flag}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if over_budget:
+        print(f"❌ p95 above {args.budget_ms}ms: {', '.join(over_budget)}", file=sys.stderr)
+        return 1
+    print(f'✅ Every query p95 is within {args.budget_ms}ms')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Deck-listing serialization benchmark.
+
+Seeds one large account and times ``GET /api/decks`` against the previous
+implementation of the same view: ORM objects loaded with ``selectinload``,
+``to_dict()`` per card, and Flask's stdlib JSON provider. The previous view
+is registered on a side route so both run through the same request
+machinery. Before timing, the script checks that both return the same
+payload.
+
+``--json-backend`` selects the encoder the app is built with (the compiled
+serializers depend on it), so run it once per backend to compare them.
+
+Usage:
+    python benchmarks/serialization.py
+    python benchmarks/serialization.py --decks 200 --cards 50 --json-backend stdlib
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+VARIANTS = {
+    'full': '',
+    'summary+cards': 'fields=summary&include=cards',
+    'summary': 'fields=summary',
+}
+
+
+def seed(app_module, decks, cards):
+    db = app_module.db
+    now = datetime.utcnow()
+    user = app_module.User(email='serialization@example.com', is_premium=True)
+    db.session.add(user)
+    db.session.flush()
+
+    for d in range(decks):
+        deck = app_module.Deck(user_id=user.id, title=f'Deck {d}', original_notes='Seeded notes',
+                               total_cards=cards, created_at=now - timedelta(hours=d),
+                               last_studied=now - timedelta(days=d % 3) if d % 2 else None)
+        db.session.add(deck)
+        db.session.flush()
+        for c in range(cards):
+            db.session.add(app_module.Flashcard(
+                deck_id=deck.id,
+                question=f'Seeded question {c} about topic {d}?',
+                question_type='multiple-choice',
+                options=['Alpha', 'Beta', 'Gamma', 'Delta'],
+                correct_answer='Alpha',
+                explanation='Seeded explanation with a little more text in it.',
+                times_studied=c % 5,
+                times_correct=c % 3,
+                mastery_level=(c % 10) / 10,
+                last_studied=now - timedelta(days=c % 4) if c % 4 else None,
+                next_review=now + timedelta(days=(c % 7) - 3)
+            ))
+
+    user.total_decks = decks
+    user.total_cards = decks * cards
+    db.session.commit()
+    return user.id
+
+
+def register_legacy_view(app_module):
+    """The deck listing as it was before compiled serializers and orjson"""
+    from flask import request, session
+    from flask.json.provider import DefaultJSONProvider
+    from sqlalchemy.orm import selectinload
+
+    app, Deck = app_module.app, app_module.Deck
+    stdlib_json = DefaultJSONProvider(app)
+
+    @app.route('/bench/legacy-decks')
+    def legacy_decks():
+        summary = request.args.get('fields') == 'summary'
+        include_cards = not summary or request.args.get('include') == 'cards'
+        etag, last_modified = app_module.deck_list_version(session['user_id'], include_due=summary)
+        query = Deck.query.filter_by(user_id=session['user_id'], is_archived=False)
+        query = query.order_by(Deck.created_at.desc(), Deck.id.desc())
+        if include_cards:
+            query = query.options(selectinload(Deck.cards))
+        decks = query.all()
+        summaries = app_module.deck_card_summaries([deck.id for deck in decks]) if summary else {}
+
+        results = []
+        for deck in decks:
+            item = {
+                'id': deck.id,
+                'title': deck.title,
+                'created': deck.created_at.isoformat(),
+                'lastStudied': deck.last_studied.isoformat() if deck.last_studied else None,
+                'progress': deck.progress
+            }
+            if summary:
+                item.update(summaries.get(deck.id, app_module.EMPTY_DECK_SUMMARY))
+            if include_cards:
+                item['cards'] = [card.to_dict() for card in deck.cards]
+            results.append(item)
+        response = stdlib_json.response({'decks': results, 'next_cursor': None})
+        return app_module.add_validators(response, etag, last_modified)
+
+
+def normalized(payload):
+    """Payload with card lists in id order (neither query orders cards)"""
+    for deck in payload['decks']:
+        if 'cards' in deck:
+            deck['cards'] = sorted(deck['cards'], key=lambda card: card['id'])
+    return payload
+
+
+def time_route(client, url, iterations, warmup):
+    timings, size = [], 0
+    for i in range(warmup + iterations):
+        started = time.perf_counter()
+        response = client.get(url)
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise RuntimeError(f'{url} returned {response.status_code}: {response.get_data(as_text=True)[:200]}')
+        size = len(response.get_data())
+        if i >= warmup:
+            timings.append(elapsed * 1000)
+    timings.sort()
+    return {
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        'bytes': size
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the deck listing before and after compiled serializers')
+    parser.add_argument('--decks', type=int, default=100)
+    parser.add_argument('--cards', type=int, default=40, help='Flashcards per deck')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--json-backend', default='auto', choices=['auto', 'orjson', 'stdlib'])
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix='serialization-'), 'serialization.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['JSON_BACKEND'] = args.json_backend
+    os.environ.pop('OPENROUTER_API_KEY', None)
+    os.environ['OPENROUTER_VALIDATE_ON_STARTUP'] = 'False'
+    sys.path.insert(0, BACKEND_DIR)
+
+    import logging
+    logging.disable(logging.ERROR)
+
+    import app as app_module
+
+    register_legacy_view(app_module)
+    with app_module.app.app_context():
+        app_module.db.create_all()
+        user_id = seed(app_module, args.decks, args.cards)
+
+    client = app_module.app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session['user_id'] = user_id
+
+    results = {
+        'created_at': datetime.utcnow().isoformat(),
+        'json_backend': app_module.json_backend.name,
+        'decks': args.decks,
+        'cards_per_deck': args.cards,
+        'variants': {}
+    }
+    print(f"JSON backend: {results['json_backend']}, {args.decks} decks x {args.cards} cards")
+
+    for name, query in VARIANTS.items():
+        current_url = f'/api/decks?{query}'
+        legacy_url = f'/bench/legacy-decks?{query}'
+        if normalized(client.get(current_url).get_json()) != normalized(client.get(legacy_url).get_json()):
+            print(f'❌ {name}: payload differs from the previous implementation', file=sys.stderr)
+            return 1
+
+        before = time_route(client, legacy_url, args.iterations, args.warmup)
+        after = time_route(client, current_url, args.iterations, args.warmup)
+        speedup = round(before['p50_ms'] / after['p50_ms'], 2) if after['p50_ms'] else None
+        results['variants'][name] = {'before': before, 'after': after, 'speedup_p50': speedup}
+        print(f"{name:15} before p50 {before['p50_ms']:8.2f}ms  after p50 {after['p50_ms']:8.2f}ms  "
+              f"x{speedup}  ({after['bytes']} bytes)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the backend.
+
+Imports ``app`` in fresh interpreter processes and reports how long it takes,
+failing when the median exceeds the budget. Startup must never wait on the
+network, so a dummy OpenRouter token is used and any outbound call made at
+import time would show up as a blown budget.
+
+Usage:
+    python benchmarks/startup.py --runs 5 --budget 2.0
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = """
+import time
+started = time.perf_counter()
+import app
+print(time.perf_counter() - started)
+"""
+
+
+def measure_once(env):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-c', IMPORT_SNIPPET],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    wall = time.perf_counter() - started
+
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing app failed:\n{result.stderr}")
+
+    return float(result.stdout.strip().splitlines()[-1]), wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure backend cold-start time')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=float(os.environ.get('STARTUP_BUDGET_SECONDS', 2.0)),
+                        help='Maximum median import time in seconds')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault('DATABASE_URL', 'sqlite:////tmp/ai_study_buddy_startup.db')
+    env['OPENROUTER_API_KEY'] = 'sk-or-startup-benchmark-dummy-token'
+    env['OPENROUTER_VALIDATE_ON_STARTUP'] = 'False'
+
+    imports, walls = [], []
+    for _ in range(args.runs):
+        import_seconds, wall_seconds = measure_once(env)
+        imports.append(import_seconds)
+        walls.append(wall_seconds)
+
+    results = {
+        'runs': args.runs,
+        'budget_seconds': args.budget,
+        'import_seconds': {
+            'min': round(min(imports), 4),
+            'median': round(statistics.median(imports), 4),
+            'max': round(max(imports), 4)
+        },
+        'process_seconds': {
+            'min': round(min(walls), 4),
+            'median': round(statistics.median(walls), 4),
+            'max': round(max(walls), 4)
+        }
+    }
+    results['within_budget'] = results['import_seconds']['median'] <= args.budget
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if not results['within_budget']:
+        print(f"❌ Median import time exceeds the {args.budget}s budget", file=sys.stderr)
+        return 1
+
+    print(f"✅ Cold start within the {args.budget}s budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,35 @@
+"""
+Bulk INSERT helper for write paths that create many rows at once.
+
+Adding ORM objects one by one costs a unit-of-work pass per object at flush
+time. For rows that are only written (not read back or modified in the same
+request) that bookkeeping is wasted, so ``insert_rows()`` hands plain dicts
+to a single Core ``INSERT`` executed with the whole parameter list.
+
+The statement is compiled once and cached whatever the row count. PyMySQL
+rewrites the executemany into multi-row ``INSERT ... VALUES (...), (...)``
+batches, and SQLite runs its one prepared statement for every row. Building
+one literal ``VALUES`` list per call was measured to be slower: the
+statement has to be recompiled for every distinct row count
+(see benchmarks/bulk_insert.py).
+
+Rows bypass the session, so ORM events and ``__init__`` logic do not run for
+them; column defaults still apply to columns a row leaves out.
+"""
+
+from typing import Dict, List
+
+from sqlalchemy import insert
+
+
+def insert_rows(session, table, rows: List[Dict]) -> int:
+    """
+    Insert ``rows`` into ``table`` inside the session's transaction.
+
+    Every row must have the same keys. Returns the number of rows written.
+    """
+    if not rows:
+        return 0
+
+    session.execute(insert(table), rows)
+    return len(rows)
@@ -0,0 +1,179 @@
+"""
+Chunked, parallel question generation for long notes.
+
+The model only sees about 3000 characters of notes per request. Instead of
+truncating long handouts, notes are split on heading/paragraph boundaries
+into chunks of at most ``max_chars``, the question budget is shared out
+across chunks by length, every chunk is generated concurrently on a bounded
+thread pool, and the per-chunk results are merged round-robin (so each
+section is represented) with duplicate questions removed.
+"""
+
+import logging
+import re
+from concurrent.futures import Executor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_HEADING_RE = re.compile(r'^\s*(#{1,6}\s+\S.*|[A-Z0-9][A-Z0-9 ,&/\-]{2,80}:?|\d+(\.\d+)*[.)]\s+\S.*)\s*$')
+_PARAGRAPH_BREAK_RE = re.compile(r'\n\s*\n')
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+')
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _blocks(notes: str) -> List[str]:
+    """Split notes into paragraphs, starting a new block at every heading"""
+    blocks = []
+    for paragraph in _PARAGRAPH_BREAK_RE.split(notes):
+        current = []
+        for line in paragraph.split('\n'):
+            if _HEADING_RE.match(line) and current:
+                blocks.append('\n'.join(current).strip())
+                current = []
+            current.append(line)
+        if current:
+            blocks.append('\n'.join(current).strip())
+    return [block for block in blocks if block]
+
+
+def _split_long_block(block: str, max_chars: int) -> List[str]:
+    """Split an oversized paragraph on sentence boundaries (hard cut as last resort)"""
+    pieces, current = [], ''
+    for sentence in _SENTENCE_END_RE.split(block):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ''
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_notes(notes: str, max_chars: int = 3000) -> List[str]:
+    """
+    Split notes into chunks of at most ``max_chars`` characters.
+
+    Chunks are built from whole headings/paragraphs where possible, so related
+    content stays together; only paragraphs that are too long on their own are
+    broken up, on sentence boundaries.
+    """
+    notes = (notes or '').strip()
+    if len(notes) <= max_chars:
+        return [notes] if notes else []
+
+    chunks, current = [], ''
+    for block in _blocks(notes):
+        for piece in ([block] if len(block) <= max_chars else _split_long_block(block, max_chars)):
+            if current and len(current) + 2 + len(piece) > max_chars:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current}\n\n{piece}" if current else piece
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def target_question_count(chunks: List[str], per_chunk: int, minimum: int, maximum: int) -> int:
+    """Total questions for a set of chunks, scaled with the amount of notes"""
+    return max(minimum, min(maximum, per_chunk * len(chunks)))
+
+
+def allocate_questions(chunks: List[str], total: int) -> List[int]:
+    """
+    Share ``total`` questions across chunks in proportion to their length.
+
+    Every chunk gets at least one question while there are enough to go round;
+    the remainder goes to the chunks with the largest fractional share.
+    """
+    if not chunks:
+        return []
+    if total <= len(chunks):
+        # Fewer questions than chunks: one each for the longest chunks
+        longest = sorted(range(len(chunks)), key=lambda i: len(chunks[i]), reverse=True)[:total]
+        return [1 if i in longest else 0 for i in range(len(chunks))]
+
+    lengths = [max(len(chunk), 1) for chunk in chunks]
+    spare = total - len(chunks)
+    shares = [spare * length / sum(lengths) for length in lengths]
+    allocations = [1 + int(share) for share in shares]
+
+    leftover = total - sum(allocations)
+    by_remainder = sorted(range(len(chunks)), key=lambda i: shares[i] - int(shares[i]), reverse=True)
+    for i in by_remainder[:leftover]:
+        allocations[i] += 1
+    return allocations
+
+
+def question_signature(question: Dict) -> str:
+    """Normalized question text used to spot exact duplicates"""
+    text = _NON_WORD_RE.sub(' ', str(question.get('question', '')).lower())
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+class QuestionDeduplicator:
+    """Remembers the questions seen so far and rejects repeats"""
+
+    def __init__(self):
+        self._seen = set()
+
+    def add(self, question: Dict) -> bool:
+        """Return True if the question is new (and remember it)"""
+        signature = question_signature(question)
+        if not signature or signature in self._seen:
+            return False
+        self._seen.add(signature)
+        return True
+
+
+def iter_chunk_results(chunks: List[str], allocations: List[int],
+                       generate_fn: Callable[[str, int], Optional[List[Dict]]],
+                       executor: Executor, errors: List = None) -> Iterator[Tuple[int, List[Dict]]]:
+    """
+    Generate every chunk concurrently, yielding (chunk_index, questions) as
+    each one completes. Failed chunks yield an empty list; their exceptions
+    are appended to ``errors`` when a list is given.
+    """
+    futures = {
+        executor.submit(generate_fn, chunk, count): index
+        for index, (chunk, count) in enumerate(zip(chunks, allocations))
+        if count > 0
+    }
+
+    for future in as_completed(futures):
+        index = futures[future]
+        try:
+            questions = future.result() or []
+        except Exception as e:
+            logger.error(f"Chunk {index} generation failed: {str(e)}")
+            if errors is not None:
+                errors.append(e)
+            questions = []
+        yield index, questions
+
+
+def merge_chunk_questions(per_chunk: List[List[Dict]], total: int) -> List[Dict]:
+    """Interleave per-chunk results round-robin, dropping duplicates, up to ``total``"""
+    deduplicator = QuestionDeduplicator()
+    merged = []
+    depth = max((len(questions) for questions in per_chunk), default=0)
+
+    for position in range(depth):
+        for questions in per_chunk:
+            if position < len(questions) and deduplicator.add(questions[position]):
+                merged.append(questions[position])
+                if len(merged) >= total:
+                    return merged
+    return merged
@@ -0,0 +1,228 @@
+"""
+Response compression negotiated from ``Accept-Encoding``.
+
+Text responses (JSON, NDJSON, CSV, HTML) of at least ``min_size`` bytes are
+compressed with brotli when the client accepts it and the ``brotli`` package
+is installed, and with gzip otherwise. Smaller bodies go out as they are,
+because compressing them costs more CPU than it saves on the wire.
+
+Compression is incremental so a body is never held twice:
+
+* Streamed responses (generators) are compressed chunk by chunk as the
+  server sends them.
+* Buffered bodies of at least ``stream_min_size`` bytes are fed to the
+  compressor in slices of the existing buffer. Compressed output is sent as
+  it is produced instead of being collected into a second copy.
+* Smaller buffered bodies are compressed in one call, which keeps their
+  ``Content-Length``. They are sent uncompressed if that does not make them
+  smaller.
+
+Server-sent events are never compressed: compressors hold back output until
+they have enough input, which would delay events.
+"""
+
+import threading
+import zlib
+from typing import Dict, Iterable, Iterator, Optional
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only without it
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+}
+NEVER_COMPRESSED = {'text/event-stream'}
+
+# Bytes fed to the compressor per step when streaming a buffered body
+STREAM_SLICE = 64 * 1024
+
+# Preference when the client accepts several encodings equally
+_PREFERENCE = ('br', 'gzip')
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """``gzip, br;q=0.8`` -> {'gzip': 1.0, 'br': 0.8}; unparseable q-values count as 0"""
+    accepted = {}
+    for item in (header or '').split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def is_compressible(mimetype: Optional[str]) -> bool:
+    if not mimetype or mimetype in NEVER_COMPRESSED:
+        return False
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES or mimetype.endswith('+json')
+
+
+class ResponseCompressor:
+    """``after_request`` hook compressing eligible responses (see module docstring)"""
+
+    def __init__(self, enabled: bool = True, min_size: int = 1024, gzip_level: int = 6,
+                 brotli_quality: int = 4, stream_min_size: int = 1024 * 1024):
+        self.enabled = enabled
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.stream_min_size = stream_min_size
+        self.encodings = tuple(name for name in _PREFERENCE if name != 'br' or brotli is not None)
+
+        self._lock = threading.Lock()
+        self._counters = {name: {'responses': 0, 'streamed': 0, 'bytes_in': 0, 'bytes_out': 0}
+                          for name in self.encodings}
+        self._skipped = {'too_small': 0, 'not_smaller': 0, 'not_accepted': 0}
+
+    def choose(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """Best supported encoding the client accepts, or None for identity"""
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get('*', 0.0)
+        best, best_quality = None, 0.0
+        for name in self.encodings:
+            quality = accepted.get(name, wildcard)
+            if quality > best_quality:
+                best, best_quality = name, quality
+        return best
+
+    def compressor(self, encoding: str):
+        """Fresh incremental compressor with ``compress(data)`` and ``flush()``"""
+        if encoding == 'br':
+            return _BrotliStream(self.brotli_quality)
+        # wbits 16 + MAX_WBITS writes the gzip header and trailer
+        return zlib.compressobj(self.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        """One-shot compression of a whole body"""
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality)
+        compressor = self.compressor(encoding)
+        return compressor.compress(data) + compressor.flush()
+
+    def iter_compressed(self, chunks: Iterable, encoding: str) -> Iterator[bytes]:
+        """Compress an iterable of str/bytes chunks, yielding output as it is produced"""
+        compressor = self.compressor(encoding)
+        bytes_in = bytes_out = 0
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                bytes_in += len(chunk)
+                output = compressor.compress(chunk)
+                if output:
+                    bytes_out += len(output)
+                    yield output
+            output = compressor.flush()
+            bytes_out += len(output)
+            yield output
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close:
+                close()
+            self._record(encoding, bytes_in, bytes_out, streamed=True)
+
+    def _record(self, encoding: str, bytes_in: int, bytes_out: int, streamed: bool = False):
+        with self._lock:
+            counters = self._counters[encoding]
+            counters['responses'] += 1
+            counters['streamed'] += int(streamed)
+            counters['bytes_in'] += bytes_in
+            counters['bytes_out'] += bytes_out
+
+    def _skip(self, reason: str):
+        with self._lock:
+            self._skipped[reason] += 1
+
+    def __call__(self, response: Response) -> Response:
+        if (not self.enabled or request.method == 'HEAD' or response.status_code < 200
+                or response.status_code in (204, 304) or response.direct_passthrough
+                or 'Content-Encoding' in response.headers or not is_compressible(response.mimetype)):
+            return response
+
+        # Caches must keep compressed and identity variants apart
+        response.vary.add('Accept-Encoding')
+
+        encoding = self.choose(request.headers.get('Accept-Encoding'))
+        if encoding is None:
+            self._skip('not_accepted')
+            return response
+
+        if response.is_streamed:
+            response.response = self.iter_compressed(response.response, encoding)
+            self._mark(response, encoding)
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            self._skip('too_small')
+            return response
+
+        if len(data) >= self.stream_min_size:
+            view = memoryview(data)
+            slices = (view[start:start + STREAM_SLICE] for start in range(0, len(view), STREAM_SLICE))
+            response.response = self.iter_compressed(slices, encoding)
+            self._mark(response, encoding)
+            return response
+
+        compressed = self.compress(data, encoding)
+        if len(compressed) >= len(data):
+            self._skip('not_smaller')
+            return response
+
+        response.set_data(compressed)
+        self._mark(response, encoding)
+        self._record(encoding, len(data), len(compressed))
+        return response
+
+    @staticmethod
+    def _mark(response: Response, encoding: str):
+        response.headers['Content-Encoding'] = encoding
+        if response.is_streamed:
+            response.headers.pop('Content-Length', None)
+        # A strong validator must differ between encodings of the same body
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            encodings = {name: dict(counters) for name, counters in self._counters.items()}
+            skipped = dict(self._skipped)
+        for counters in encodings.values():
+            counters['ratio'] = round(counters['bytes_out'] / counters['bytes_in'], 4) if counters['bytes_in'] else 0.0
+        return {
+            'enabled': self.enabled,
+            'available': list(self.encodings),
+            'encodings': encodings,
+            'skipped': skipped
+        }
+
+
+class _BrotliStream:
+    """brotli.Compressor with the zlib compressobj method names"""
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data) -> bytes:
+        return self._compressor.process(bytes(data))
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
@@ -0,0 +1,57 @@
+"""
+Conditional GET support (ETag / Last-Modified) for read endpoints.
+
+Routes compute a cheap version for the data they are about to return (a few
+timestamps and counts, usually one aggregate query) and call
+``not_modified()`` before loading and serializing the full payload. When the
+client already holds that version the route returns 304 straight away;
+otherwise ``add_validators()`` stamps the fresh response.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from typing import Optional
+
+from flask import Response, request
+
+# Bump when the JSON shape of a validated endpoint changes
+PAYLOAD_VERSION = 1
+
+
+def compute_etag(*parts) -> str:
+    """Opaque tag for the given version parts"""
+    raw = '|'.join(str(part) for part in (PAYLOAD_VERSION,) + parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def latest(*timestamps: Optional[datetime]) -> Optional[datetime]:
+    """Most recent of the given (possibly missing) timestamps"""
+    present = [ts for ts in timestamps if ts is not None]
+    return max(present) if present else None
+
+
+def _as_http_date(ts: datetime) -> datetime:
+    # Stored timestamps are naive UTC; HTTP dates have whole-second precision
+    return ts.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None) -> Optional[Response]:
+    """Return a 304 response if the request's validators match, else None"""
+    if request.if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        if not request.if_none_match.contains_weak(etag):
+            return None
+    elif not (request.if_modified_since and last_modified
+              and _as_http_date(last_modified) <= request.if_modified_since):
+        return None
+
+    return add_validators(Response(status=304), etag, last_modified)
+
+
+def add_validators(response: Response, etag: str, last_modified: Optional[datetime] = None) -> Response:
+    """Attach ETag/Last-Modified and make clients revalidate before reuse"""
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = _as_http_date(last_modified)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -20,13 +20,78 @@ class Config:
     
     # AI Configuration
     api_token= os.environ.get('OPENROUTER_API_KEY')
+    OPENROUTER_VALIDATE_ON_STARTUP = os.environ.get('OPENROUTER_VALIDATE_ON_STARTUP', 'True').lower() == 'true'
     MAX_QUESTIONS_PER_DECK = 10
     MIN_NOTE_LENGTH = 100
     MAX_NOTE_LENGTH = 5000
+    PREMIUM_MAX_NOTE_LENGTH = int(os.environ.get('PREMIUM_MAX_NOTE_LENGTH', 200000))  # ~50 pages
+    
+    # Long notes are split into chunks generated in parallel
+    CHUNK_MAX_CHARS = int(os.environ.get('CHUNK_MAX_CHARS', 3000))
+    CHUNK_GENERATION_WORKERS = int(os.environ.get('CHUNK_GENERATION_WORKERS', 4))
+    QUESTIONS_PER_CHUNK = int(os.environ.get('QUESTIONS_PER_CHUNK', 5))
+    MAX_GENERATED_QUESTIONS = int(os.environ.get('MAX_GENERATED_QUESTIONS', 50))
+    
+    # Generation cache (in-process LRU tier + database tier)
+    GENERATION_CACHE_MAX_ENTRIES = int(os.environ.get('GENERATION_CACHE_MAX_ENTRIES', 256))
+    GENERATION_CACHE_TTL_SECONDS = int(os.environ.get('GENERATION_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+    GENERATION_CACHE_DB_MAX_ENTRIES = int(os.environ.get('GENERATION_CACHE_DB_MAX_ENTRIES', 10000))
+    GENERATION_CACHE_PURGE_EVERY = int(os.environ.get('GENERATION_CACHE_PURGE_EVERY', 100))
+    
+    # Background generation jobs (POST /api/generate-flashcards?async=true)
+    GENERATION_JOB_WORKERS = int(os.environ.get('GENERATION_JOB_WORKERS', 4))
+    GENERATION_JOB_QUEUE_SIZE = int(os.environ.get('GENERATION_JOB_QUEUE_SIZE', 32))
+    
+    # Local question generator (no network): fallback and low-latency engine
+    LOCAL_GENERATION_FALLBACK = os.environ.get('LOCAL_GENERATION_FALLBACK', 'True').lower() == 'true'
+    LOCAL_ENGINE_MAX_NOTE_LENGTH = int(os.environ.get('LOCAL_ENGINE_MAX_NOTE_LENGTH', 0))  # 0 = always use AI
+    
+    # OpenRouter admission control (token bucket + in-flight limit + bounded queue)
+    OPENROUTER_REQUESTS_PER_MINUTE = float(os.environ.get('OPENROUTER_REQUESTS_PER_MINUTE', 20))
+    OPENROUTER_BURST = int(os.environ.get('OPENROUTER_BURST', 5))
+    OPENROUTER_MAX_IN_FLIGHT = int(os.environ.get('OPENROUTER_MAX_IN_FLIGHT', 4))
+    OPENROUTER_QUEUE_SIZE = int(os.environ.get('OPENROUTER_QUEUE_SIZE', 16))
+    OPENROUTER_QUEUE_TIMEOUT = float(os.environ.get('OPENROUTER_QUEUE_TIMEOUT', 10))
+    OPENROUTER_LIMITER_DIR = os.environ.get('OPENROUTER_LIMITER_DIR')  # shared across processes when set
+    
+    # Outbound HTTP client (shared keep-alive pool for OpenRouter and Paystack)
+    HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', 10))  # hosts kept pooled
+    HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 10))  # connections per host
+    HTTP_POOL_BLOCK = os.environ.get('HTTP_POOL_BLOCK', 'False').lower() == 'true'
+    HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 5))
+    HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', 30))
+    HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 2))
+    
+    # Per-request SQL profiling: always on, or per request with an
+    # "X-SQL-Profile: <token>" header matching SQL_PROFILING_TOKEN
+    SQL_PROFILING = os.environ.get('SQL_PROFILING', 'False').lower() == 'true'
+    SQL_PROFILING_TOKEN = os.environ.get('SQL_PROFILING_TOKEN')
+    SQL_PROFILING_N_PLUS_ONE_THRESHOLD = int(os.environ.get('SQL_PROFILING_N_PLUS_ONE_THRESHOLD', 3))
+    
+    # JSON encoder for responses: auto (orjson when installed), orjson or stdlib
+    JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+    
+    # Response compression (gzip, or brotli when installed) from Accept-Encoding
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'True').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))  # bytes
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))  # 1-9
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4))  # 0-11
+    COMPRESSION_STREAM_MIN_SIZE = int(os.environ.get('COMPRESSION_STREAM_MIN_SIZE', 1024 * 1024))  # bytes
+    
+    # Library import: cards per bulk INSERT, cards per upload, longest NDJSON line
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 500))
+    IMPORT_MAX_CARDS = int(os.environ.get('IMPORT_MAX_CARDS', 50000))
+    IMPORT_MAX_LINE_CHARS = int(os.environ.get('IMPORT_MAX_LINE_CHARS', 1024 * 1024))
+    
+    # Near-duplicate questions (MinHash/LSH): dropped from new decks at this Jaccard similarity
+    NEAR_DUPLICATE_DETECTION = os.environ.get('NEAR_DUPLICATE_DETECTION', 'True').lower() == 'true'
+    NEAR_DUPLICATE_THRESHOLD = float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', 0.7))
     
     # Premium limits
     FREE_TIER_MONTHLY_DECKS = 5
     PREMIUM_TIER_MONTHLY_DECKS = -1  # Unlimited
+    QUOTA_WINDOW_DAYS = int(os.environ.get('QUOTA_WINDOW_DAYS', 30))
+    QUOTA_CACHE_TTL_SECONDS = float(os.environ.get('QUOTA_CACHE_TTL_SECONDS', 60))
     
     # IntaSend Configuration
     PAYSTACK_PUBLIC_KEY = os.environ.get('PAYSTACK_PUBLIC_KEY')
@@ -0,0 +1,327 @@
+"""
+Content-addressed cache for AI generated flashcard questions.
+
+Students tend to paste the same lecture handouts again and again, and every
+repeat used to cost a full OpenRouter round trip. Generated question sets are
+keyed on a hash of the normalized notes together with the model name and the
+number of questions requested, and stored in two tiers:
+
+- an in-process LRU dictionary with a TTL (fast, per worker)
+- a database table shared by every worker (persistent, survives restarts)
+
+The database tier runs on its own connection, so a cache lookup never commits
+or rolls back the caller's request session. Hit counts are kept in memory and
+written in batches, so a hit stays a read.
+
+Expired database rows are deleted when looked up, and by purge_expired(),
+which runs on a background runner every ``purge_every`` stores. The purge
+also caps the table at ``max_db_entries`` rows, dropping the entries that
+expire first (the oldest stores, since every entry gets the same TTL).
+"""
+
+import copy
+import hashlib
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, select, update
+
+from jobs import JobQueueFull
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Database hits recorded before their hit counts are written in one transaction
+HIT_FLUSH_BATCH = 64
+
+
+def normalize_notes(notes: str) -> str:
+    """Normalize notes so trivially different pastes share a cache entry"""
+    notes = unicodedata.normalize('NFC', notes or '')
+    return _WHITESPACE_RE.sub(' ', notes).strip()
+
+
+def notes_fingerprint(notes: str) -> str:
+    """SHA-256 hex digest of the normalized notes (fits Deck.notes_hash)"""
+    return hashlib.sha256(normalize_notes(notes).encode('utf-8')).hexdigest()
+
+
+def generation_cache_key(notes: str, model: str, num_questions: int) -> str:
+    """Cache key for a generation request"""
+    raw = f"{model}\x00{num_questions}\x00{normalize_notes(notes)}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class GenerationCache:
+    """
+    Two-tier (memory + database) cache of generated question lists.
+
+    The database tier is optional: pass the Flask-SQLAlchemy ``db`` object and
+    the model class used to persist entries. Database errors are logged and
+    treated as cache misses so the cache can never break generation. With a
+    ``runner`` (JobRunner), purges run there instead of on the storing thread.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: int = 86400,
+                 db=None, entry_model=None, max_db_entries: int = 10000,
+                 purge_every: int = 100, runner=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db = db
+        self.entry_model = entry_model
+        self.max_db_entries = max_db_entries
+        self.purge_every = purge_every
+        self.runner = runner
+        self._stores_since_purge = 0
+
+        self._entries = OrderedDict()  # key -> (expires_at_monotonic, questions)
+        self._pending_hits = {}  # key -> (hits not yet written, last hit time)
+        self._lock = threading.Lock()
+        self._counters = {
+            'memory_hits': 0,
+            'db_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'db_errors': 0,
+            'hit_flushes': 0,
+            'purges': 0,
+            'purged': 0
+        }
+
+    @property
+    def persistent(self) -> bool:
+        return self.db is not None and self.entry_model is not None
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] += amount
+
+    # Memory tier
+    def _memory_get(self, key: str) -> Optional[List[Dict]]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+
+            expires_at, questions = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._counters['expirations'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            # Callers may edit the questions they get; the cached copy stays intact
+            return copy.deepcopy(questions)
+
+    def _memory_put(self, key: str, questions: List[Dict], ttl_seconds: float):
+        questions = copy.deepcopy(questions)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, questions)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    # Database tier
+    def _db_get(self, key: str) -> Optional[tuple]:
+        if not self.persistent:
+            return None
+
+        table = self.entry_model.__table__
+        try:
+            with self.db.engine.begin() as conn:
+                entry = conn.execute(
+                    select(table.c.questions, table.c.expires_at).where(table.c.cache_key == key)
+                ).first()
+                if entry is None:
+                    return None
+
+                now = datetime.utcnow()
+                if entry.expires_at and entry.expires_at <= now:
+                    conn.execute(delete(table).where(table.c.cache_key == key))
+                    self._count('expirations')
+                    return None
+
+            self._record_hit(key, now)
+            remaining = (entry.expires_at - now).total_seconds() if entry.expires_at else self.ttl_seconds
+            return entry.questions, remaining
+
+        except Exception as e:
+            logger.warning(f"Generation cache lookup failed: {str(e)}")
+            self._count('db_errors')
+            return None
+
+    def _db_put(self, key: str, questions: List[Dict], model: str, num_questions: int):
+        if not self.persistent:
+            return
+
+        table = self.entry_model.__table__
+        try:
+            now = datetime.utcnow()
+            with self.db.engine.begin() as conn:
+                # Replace any previous entry for the key (portable upsert)
+                conn.execute(delete(table).where(table.c.cache_key == key))
+                conn.execute(table.insert().values(
+                    cache_key=key,
+                    model=model,
+                    num_questions=num_questions,
+                    questions=questions,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=self.ttl_seconds),
+                    hit_count=0
+                ))
+
+        except Exception as e:
+            logger.warning(f"Generation cache store failed: {str(e)}")
+            self._count('db_errors')
+
+    def _record_hit(self, key: str, now: datetime):
+        with self._lock:
+            hits, _ = self._pending_hits.get(key, (0, None))
+            self._pending_hits[key] = (hits + 1, now)
+            due = sum(hits for hits, _ in self._pending_hits.values()) >= HIT_FLUSH_BATCH
+
+        if due:
+            self.flush_hits()
+
+    def flush_hits(self) -> int:
+        """Write the batched hit counts of database entries, returning the number of entries updated"""
+        with self._lock:
+            pending, self._pending_hits = self._pending_hits, {}
+        if not pending or not self.persistent:
+            return 0
+
+        table = self.entry_model.__table__
+        try:
+            with self.db.engine.begin() as conn:
+                for key, (hits, last_hit_at) in pending.items():
+                    conn.execute(
+                        update(table)
+                        .where(table.c.cache_key == key)
+                        .values(hit_count=table.c.hit_count + hits, last_hit_at=last_hit_at)
+                    )
+            self._count('hit_flushes')
+            return len(pending)
+
+        except Exception as e:
+            # Hit counts are informational; drop this batch rather than retry
+            logger.warning(f"Generation cache hit count update failed: {str(e)}")
+            self._count('db_errors')
+            return 0
+
+    # Public API
+    def get(self, notes: str, model: str, num_questions: int) -> Optional[List[Dict]]:
+        """Return cached questions for these notes, or None on a miss"""
+        key = generation_cache_key(notes, model, num_questions)
+
+        questions = self._memory_get(key)
+        if questions is not None:
+            self._count('memory_hits')
+            return questions
+
+        found = self._db_get(key)
+        if found is not None:
+            questions, remaining = found
+            self._memory_put(key, questions, min(remaining, self.ttl_seconds))
+            self._count('db_hits')
+            return questions
+
+        self._count('misses')
+        return None
+
+    def put(self, notes: str, model: str, num_questions: int, questions: List[Dict]):
+        """Store a freshly generated question list in both tiers"""
+        if not questions:
+            return
+
+        key = generation_cache_key(notes, model, num_questions)
+        self._memory_put(key, questions, self.ttl_seconds)
+        self._db_put(key, questions, model, num_questions)
+        self._count('stores')
+        self._maybe_schedule_purge()
+
+    def _maybe_schedule_purge(self):
+        if not self.persistent or self.purge_every <= 0:
+            return
+        with self._lock:
+            self._stores_since_purge += 1
+            if self._stores_since_purge < self.purge_every:
+                return
+            self._stores_since_purge = 0
+
+        if self.runner is None:
+            self.purge_expired()
+            return
+        try:
+            self.runner.submit(self.purge_expired)
+        except JobQueueFull:
+            logger.warning("Generation cache purge skipped: job queue full")
+
+    def purge_expired(self) -> int:
+        """
+        Drop expired entries from both tiers, and database rows beyond
+        ``max_db_entries``. Returns the number removed.
+        """
+        removed = 0
+        now_monotonic = time.monotonic()
+
+        with self._lock:
+            for key in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now_monotonic]:
+                del self._entries[key]
+                removed += 1
+
+        if self.persistent:
+            self.flush_hits()
+            table = self.entry_model.__table__
+            try:
+                with self.db.engine.begin() as conn:
+                    removed += conn.execute(
+                        delete(table).where(table.c.expires_at <= datetime.utcnow())
+                    ).rowcount
+                    # Row cap: everything expiring no later than the first row past the limit
+                    cutoff = conn.execute(
+                        select(table.c.expires_at)
+                        .order_by(table.c.expires_at.desc())
+                        .offset(self.max_db_entries)
+                        .limit(1)
+                    ).scalar() if self.max_db_entries > 0 else None
+                    if cutoff is not None:
+                        removed += conn.execute(delete(table).where(table.c.expires_at <= cutoff)).rowcount
+                self._count('purges')
+                self._count('purged', removed)
+            except Exception as e:
+                logger.warning(f"Generation cache purge failed: {str(e)}")
+                self._count('db_errors')
+
+        return removed
+
+    def clear(self):
+        """Clear the in-process tier (the database tier is left untouched)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and hit ratio"""
+        with self._lock:
+            counters = dict(self._counters)
+            counters['size'] = len(self._entries)
+            counters['pending_hits'] = sum(hits for hits, _ in self._pending_hits.values())
+
+        hits = counters['memory_hits'] + counters['db_hits']
+        lookups = hits + counters['misses']
+        counters['hit_ratio'] = round(hits / lookups, 4) if lookups else 0.0
+        counters['max_entries'] = self.max_entries
+        counters['ttl_seconds'] = self.ttl_seconds
+        counters['max_db_entries'] = self.max_db_entries
+        counters['persistent'] = self.persistent
+        return counters
@@ -0,0 +1,178 @@
+"""
+Shared outbound HTTP client for OpenRouter and Paystack.
+
+Every upstream call goes through one pooled ``requests.Session`` so TCP and
+TLS connections are kept alive and reused per host instead of being set up
+for every request. The client also enforces a timeout on every call, retries
+transient failures (429/502/503/504 and connection errors) with jittered
+exponential backoff, and keeps per-upstream latency/error counters. A POST is
+only retried when the upstream cannot have acted on it: a 429 or 503, or a
+failure before the request was sent.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+# Statuses that mean the request was refused, not processed, so any method may retry
+# (a 502/504 can arrive after the upstream has already handled the request)
+UNPROCESSED_STATUSES = frozenset({429, 503})
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+
+class UpstreamHTTPClient:
+    """
+    Pooled HTTP client with timeouts, retries and per-upstream metrics.
+
+    ``pool_maxsize`` bounds the connections kept per host; with
+    ``pool_block=True`` it also caps concurrent requests per host, making
+    extra callers wait for a free connection instead of opening new ones.
+    """
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10, pool_block: bool = False,
+                 connect_timeout: float = 5.0, read_timeout: float = 30.0, max_retries: int = 2,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 observer: Callable[[str, float, Optional[int], bool], None] = None):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.default_timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.observer = observer  # called with (upstream, seconds, status, error) per attempt
+
+        self.session = requests.Session()
+        # Retries are handled in request() so they can be counted and jittered
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=0
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+
+        # Full jitter: uniform between 0 and the exponential ceiling
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _record(self, upstream: str, elapsed: float, status: Optional[int] = None,
+                error: bool = False, retried: bool = False):
+        with self._lock:
+            metrics = self._metrics.get(upstream)
+            if metrics is None:
+                metrics = self._metrics[upstream] = {
+                    'requests': 0,
+                    'errors': 0,
+                    'retries': 0,
+                    'statuses': {},
+                    'total_seconds': 0.0,
+                    'max_seconds': 0.0
+                }
+
+            metrics['requests'] += 1
+            metrics['total_seconds'] += elapsed
+            metrics['max_seconds'] = max(metrics['max_seconds'], elapsed)
+            if status is not None:
+                metrics['statuses'][status] = metrics['statuses'].get(status, 0) + 1
+            if error:
+                metrics['errors'] += 1
+            if retried:
+                metrics['retries'] += 1
+
+        if self.observer is not None:
+            self.observer(upstream, elapsed, status, error)
+
+    def request(self, method: str, url: str, upstream: str = None, timeout=None,
+                retries: int = None, **kwargs) -> requests.Response:
+        """
+        Send a request through the shared session.
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            upstream: Name used for metrics (defaults to the URL's host)
+            timeout: Seconds or (connect, read) tuple (defaults to the client's)
+            retries: Retry budget for transient failures (defaults to the client's)
+
+        Returns:
+            The final response; callers still decide how to treat error statuses.
+
+        Raises:
+            requests.exceptions.RequestException once retries are exhausted
+        """
+        method = method.upper()
+        upstream = upstream or urlsplit(url).hostname or 'unknown'
+        timeout = timeout if timeout is not None else self.default_timeout
+        retries = self.max_retries if retries is None else retries
+
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                elapsed = time.perf_counter() - started
+                # A read timeout on a POST may already have been processed upstream
+                retryable = not isinstance(e, requests.exceptions.ReadTimeout) or method in IDEMPOTENT_METHODS
+                will_retry = retryable and attempt < retries
+                self._record(upstream, elapsed, error=True, retried=will_retry)
+                if not will_retry:
+                    raise
+
+                delay = self._backoff(attempt)
+                logger.warning(f"{upstream} request failed ({str(e)}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            elapsed = time.perf_counter() - started
+            retry_statuses = RETRY_STATUSES if method in IDEMPOTENT_METHODS else UNPROCESSED_STATUSES
+            will_retry = response.status_code in retry_statuses and attempt < retries
+            self._record(upstream, elapsed, status=response.status_code,
+                         error=response.status_code >= 500, retried=will_retry)
+            if not will_retry:
+                return response
+
+            delay = self._backoff(attempt, response)
+            logger.warning(f"{upstream} returned {response.status_code}, retrying in {delay:.2f}s")
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def stats(self) -> Dict:
+        """Per-upstream request counts, errors, retries and latency"""
+        with self._lock:
+            result = {}
+            for upstream, metrics in self._metrics.items():
+                result[upstream] = dict(metrics, statuses=dict(metrics['statuses']))
+                result[upstream]['avg_seconds'] = round(metrics['total_seconds'] / metrics['requests'], 4)
+            return result
+
+    def close(self):
+        self.session.close()
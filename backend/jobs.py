@@ -0,0 +1,117 @@
+"""
+Bounded background worker pool for long running generation jobs.
+
+Flashcard generation blocks on an OpenRouter round trip that can take up to
+30 seconds. Running it on a Flask request thread ties up the worker pool, so
+job mode hands the work to this executor and returns immediately. Job state
+itself is persisted by the caller (see ``GenerationJob`` in ``app.py``) so any
+worker process can answer status requests.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """Raised when the job queue has no room for another job"""
+
+
+class JobRunner:
+    """
+    Thread pool with a bounded backlog.
+
+    At most ``max_workers`` jobs run at once and at most ``max_queue`` more may
+    wait for a free worker; further submissions raise ``JobQueueFull`` instead
+    of growing the backlog without limit.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 32, context_factory: Callable = None,
+                 thread_name_prefix: str = 'generation-job'):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.context_factory = context_factory
+        self.thread_name_prefix = thread_name_prefix
+
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Threads are only started once the first job arrives
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=self.thread_name_prefix
+                )
+            return self._executor
+
+    def _run(self, fn: Callable, args: tuple, kwargs: dict):
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+
+        try:
+            if self.context_factory is not None:
+                with self.context_factory():
+                    fn(*args, **kwargs)
+            else:
+                fn(*args, **kwargs)
+
+            with self._lock:
+                self._completed += 1
+
+        except Exception as e:
+            logger.error(f"Background job failed: {str(e)}")
+            with self._lock:
+                self._failed += 1
+
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._slots.release()
+
+    def submit(self, fn: Callable, *args, **kwargs):
+        """Schedule ``fn(*args, **kwargs)``, raising JobQueueFull when saturated"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise JobQueueFull('Generation queue is full, please retry shortly')
+
+        with self._lock:
+            self._queued += 1
+
+        try:
+            return self._get_executor().submit(self._run, fn, args, kwargs)
+        except Exception:
+            with self._lock:
+                self._queued -= 1
+            self._slots.release()
+            raise
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'queued': self._queued,
+                'running': self._running,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected
+            }
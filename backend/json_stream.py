@@ -0,0 +1,88 @@
+"""
+Incremental parser for a JSON array that arrives in pieces.
+
+The model streams its answer a few characters at a time. Rather than waiting
+for the closing bracket and calling ``json.loads`` on the whole body, the
+parser tracks string/escape state and nesting depth so each top-level element
+can be decoded the moment its closing brace arrives.
+"""
+
+import json
+import logging
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class JSONArrayStreamParser:
+    """
+    Yield the elements of a streamed top-level JSON array as they complete.
+
+    Anything before the opening ``[`` (such as a Markdown code fence or a
+    sentence of preamble) is ignored, as is anything after the closing ``]``.
+    Elements that fail to decode are logged and skipped.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.skipped = 0
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def feed(self, text: str) -> Iterator:
+        """Consume a chunk of text and yield every element it completes"""
+        for char in text:
+            if self._finished:
+                return
+
+            if not self._started:
+                if char == '[':
+                    self._started = True
+                continue
+
+            if self._depth == 0:
+                # Between elements: only whitespace, commas and the final bracket
+                if char == ']':
+                    self._finished = True
+                elif char in '{[':
+                    self._depth = 1
+                    self._buffer = [char]
+                continue
+
+            self._buffer.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    element = self._decode(''.join(self._buffer))
+                    self._buffer = []
+                    if element is not None:
+                        yield element
+
+    def _decode(self, raw: str):
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError as e:
+            self.skipped += 1
+            logger.warning(f"Skipping malformed streamed element: {str(e)}")
+            return None
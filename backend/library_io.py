@@ -0,0 +1,184 @@
+"""
+Streaming formats for library export and import.
+
+NDJSON (one JSON object per line) is the native format. An export starts
+with a header record, followed by each deck and then that deck's cards.
+``record`` says what a line is (``type`` is a card's question type):
+
+    {"record": "export", "version": 1, "exported_at": "..."}
+    {"record": "deck", "id": "d1", "title": "Cells", "original_notes": "...", ...}
+    {"record": "card", "deck_id": "d1", "question": "...", "type": "multiple-choice", ...}
+
+Imports accept the same records. A card's ``deck_id`` names a deck record
+earlier in the upload (any string, e.g. the exported id) or one of the
+user's existing decks. The header is optional.
+
+CSV has one card per row, and decks are implied by the ``deck`` column:
+
+    deck,question,type,options,correct_answer,explanation,difficulty_level,topic
+    Cells,What powers the cell?,multiple-choice,Mitochondria|Nucleus,Mitochondria,,easy,biology
+
+Everything here works on iterators, so neither direction holds more than one
+line (plus the caller's current batch) in memory.
+"""
+
+import csv
+import io
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+EXPORT_VERSION = 1
+
+CARD_FIELDS = ('question', 'type', 'options', 'correct_answer', 'explanation', 'difficulty_level', 'topic')
+OPTION_SEPARATOR = '|'
+
+# Column widths of the decks/flashcards tables that imports must respect
+FIELD_LIMITS = {'title': 255, 'subject': 100, 'type': 50, 'difficulty_level': 20, 'topic': 100}
+
+
+class InvalidImport(ValueError):
+    """A malformed upload; ``line`` is the 1-based line (or CSV row) at fault"""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f'Line {line}: {message}')
+        self.line = line
+        self.message = message
+
+
+def text_stream(binary_stream, encoding: str = 'utf-8') -> io.TextIOWrapper:
+    """Decode a request body incrementally (utf-8-sig also drops a BOM)"""
+    if encoding == 'utf-8':
+        encoding = 'utf-8-sig'
+    return io.TextIOWrapper(io.BufferedReader(binary_stream), encoding=encoding, newline='')
+
+
+def iter_lines(text, max_line_chars: int) -> Iterator[Tuple[int, str]]:
+    """(line number, line) pairs, refusing lines longer than ``max_line_chars``"""
+    number = 0
+    while True:
+        line = text.readline(max_line_chars + 1)
+        if not line:
+            return
+        number += 1
+        if len(line) > max_line_chars and not line.endswith('\n'):
+            raise InvalidImport(number, f'line longer than {max_line_chars} characters')
+        yield number, line
+
+
+def iter_ndjson(text, loads: Callable, max_line_chars: int) -> Iterator[Tuple[int, Dict]]:
+    """Records of an NDJSON upload; blank lines are skipped"""
+    for number, line in iter_lines(text, max_line_chars):
+        if not line.strip():
+            continue
+        try:
+            record = loads(line)
+        except ValueError:
+            raise InvalidImport(number, 'not valid JSON')
+        if not isinstance(record, dict):
+            raise InvalidImport(number, 'expected a JSON object')
+        yield number, record
+
+
+def iter_csv(text, max_row_chars: int) -> Iterator[Tuple[int, Dict]]:
+    """
+    Deck and card records of a CSV upload, in the NDJSON record shape.
+    Rows (which may span lines inside quotes) longer than ``max_row_chars``
+    are refused, like over-long NDJSON lines.
+    """
+    consumed, position = [0], [1]  # characters of the current row, last line read
+
+    def lines():
+        for number, line in iter_lines(text, max_row_chars):
+            consumed[0] += len(line)
+            position[0] = number
+            yield line
+
+    reader = csv.DictReader(lines())
+    rows = iter(reader)
+    try:
+        missing = {'deck', 'question', 'correct_answer'} - set(reader.fieldnames or ())
+    except csv.Error as e:
+        raise InvalidImport(position[0], f'malformed CSV: {str(e)}')
+    if missing:
+        raise InvalidImport(1, f"missing CSV columns: {', '.join(sorted(missing))}")
+
+    decks = set()
+    while True:
+        consumed[0] = 0
+        try:
+            row = next(rows)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            raise InvalidImport(position[0], f'malformed CSV: {str(e)}')
+        number = reader.line_num
+        if consumed[0] > max_row_chars:
+            raise InvalidImport(number, f'row longer than {max_row_chars} characters')
+        title = (row.get('deck') or '').strip()
+        if not title:
+            raise InvalidImport(number, 'deck is required')
+        if title not in decks:
+            decks.add(title)
+            yield number, {'record': 'deck', 'id': title, 'title': title}
+
+        options = row.get('options') or ''
+        card = {key: row[key] for key in CARD_FIELDS if row.get(key)}
+        card.update(record='card', deck_id=title,
+                    options=[option.strip() for option in options.split(OPTION_SEPARATOR) if option.strip()])
+        yield number, card
+
+
+def validate_deck(number: int, record: Dict) -> Dict:
+    """Importable deck fields of a deck record"""
+    title = record.get('title')
+    if not isinstance(title, str) or not title.strip():
+        raise InvalidImport(number, 'deck title is required')
+    tags = record.get('tags') or []
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        raise InvalidImport(number, 'tags must be a list of strings')
+    for field in ('description', 'subject', 'original_notes'):
+        if record.get(field) is not None and not isinstance(record[field], str):
+            raise InvalidImport(number, f'{field} must be a string')
+
+    deck = {
+        'title': title.strip(),
+        'description': record.get('description'),
+        'subject': record.get('subject'),
+        'tags': tags,
+        'original_notes': record.get('original_notes') or '',
+        'is_archived': bool(record.get('is_archived', False))
+    }
+    _check_limits(number, deck)
+    return deck
+
+
+def validate_card(number: int, record: Dict, normalize: Callable[[Dict], Optional[Dict]]) -> Dict:
+    """Importable card fields of a card record (``normalize`` is the app's question check)"""
+    card = normalize(record)
+    if card is None:
+        raise InvalidImport(number, 'card needs a question and a correct_answer (options must be strings)')
+    if card['explanation'] is not None and not isinstance(card['explanation'], str):
+        raise InvalidImport(number, 'explanation must be a string')
+    _check_limits(number, card)
+    return card
+
+
+def _check_limits(number: int, values: Dict):
+    for field, limit in FIELD_LIMITS.items():
+        value = values.get(field)
+        if value is not None and (not isinstance(value, str) or len(value) > limit):
+            raise InvalidImport(number, f'{field} must be a string of at most {limit} characters')
+
+
+def ndjson_chunks(records: Iterable[Dict], dumps: Callable[[Dict], bytes],
+                  chunk_bytes: int = 64 * 1024) -> Iterator[bytes]:
+    """Encode records as NDJSON, yielding ~``chunk_bytes`` at a time"""
+    pending, size = [], 0
+    for record in records:
+        line = dumps(record) + b'\n'
+        pending.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield b''.join(pending)
+            pending, size = [], 0
+    if pending:
+        yield b''.join(pending)
@@ -0,0 +1,237 @@
+"""
+Offline question generator that runs in-process with no network access.
+
+Used as a fallback when the AI model is unavailable, rate limited or failing,
+and as a low-latency engine for short notes. The pipeline is deliberately
+simple pure Python so it can produce hundreds of cards per second:
+
+1. split the notes into sentences
+2. extract key terms (frequent content words and two-word phrases)
+3. turn sentences that mention a key term into fill-in-the-blank,
+   definition and true/false questions, drawing distractors from the other
+   key terms in the same notes
+
+Output uses the same question shape as ``normalize_question`` in ``app.py``.
+"""
+
+import hashlib
+import math
+import random
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+STOPWORDS = frozenset("""
+a about above after again against all also although am an and any are as at be because been before
+being below between both but by can could did do does doing down during each either etc even every
+few for from further had has have having he her here hers herself him himself his how however i if
+in into is it its itself just least less like made make many may me might more most much must my
+myself no nor not now of off often on once one only or other others our ours ourselves out over own
+per rather same several she should since so some such than that the their theirs them themselves
+then there therefore these they this those though through thus to too two under until up upon us
+use used uses using very via was we well were what when where whether which while who whom whose
+why will with within without would yet you your yours yourself yourselves called known example
+examples include includes including different important mainly mostly usually within first second
+third new also another way ways part parts type types kind kinds number numbers form forms
+process processes place takes take taken produce produces produced build builds main often
+""".split())
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"\'(])|\n+')
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z\-']*[A-Za-z]|[A-Za-z]")
+_DEFINITION_RE = re.compile(r'^(?P<term>.+?)\s+(?:is|are|was|were|refers to|means|describes)\s+(?P<rest>.{15,})$',
+                            re.IGNORECASE)
+
+MIN_SENTENCE_CHARS = 30
+MAX_SENTENCE_CHARS = 320
+
+
+def split_sentences(notes: str) -> List[str]:
+    """Split notes into clean sentences, dropping headings and fragments"""
+    sentences = []
+    for raw in _SENTENCE_RE.split(notes):
+        sentence = ' '.join(raw.strip().lstrip('#*-•0123456789.) ').split())
+        if MIN_SENTENCE_CHARS <= len(sentence) <= MAX_SENTENCE_CHARS and ' ' in sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+def extract_key_terms(sentences: List[str], limit: int = 40) -> List[Tuple[str, str]]:
+    """
+    Rank candidate terms by frequency, favouring two-word phrases.
+
+    Returns (key, display) pairs where ``key`` is the lower-cased term and
+    ``display`` its most common spelling in the notes.
+    """
+    counts = Counter()
+    spellings = defaultdict(Counter)
+    sentence_freq = Counter()
+
+    for sentence in sentences:
+        words = _WORD_RE.findall(sentence)
+        seen = set()
+        for i, word in enumerate(words):
+            lower = word.lower()
+            if lower in STOPWORDS or len(lower) < 4:
+                continue
+
+            candidates = [(lower, word)]
+            if i + 1 < len(words):
+                next_word = words[i + 1]
+                if next_word.lower() not in STOPWORDS and len(next_word) >= 3:
+                    candidates.append((f"{lower} {next_word.lower()}", f"{word} {next_word}"))
+
+            for key, display in candidates:
+                counts[key] += 1
+                spellings[key][display] += 1
+                seen.add(key)
+
+        for key in seen:
+            sentence_freq[key] += 1
+
+    # Terms mentioned only once are rarely key, unless the notes are very short
+    min_count = 2 if sum(1 for count in counts.values() if count >= 2) >= 8 else 1
+
+    total_sentences = max(len(sentences), 1)
+    scored = []
+    for key, count in counts.items():
+        words_in_term = key.count(' ') + 1
+        if count < min_count or (words_in_term > 1 and count < 2):
+            continue  # one-off word pairs are rarely real terms
+        spread = math.log(1 + total_sentences / sentence_freq[key])
+        score = count * (1.6 if words_in_term > 1 else 1.0) * (0.5 + spread)
+        scored.append((score, key))
+
+    scored.sort(key=lambda item: (-item[0], item[1]))
+
+    terms = []
+    for _, key in scored:
+        # Skip single words already covered by a higher ranked phrase
+        if ' ' not in key and any(key in other.split() for other, _ in terms):
+            continue
+        # Sentence-initial capitals should not leak into the options
+        display = key if key in spellings[key] else spellings[key].most_common(1)[0][0]
+        terms.append((key, display))
+        if len(terms) >= limit:
+            break
+    return terms
+
+
+class LocalQuestionGenerator:
+    """
+    Rule-based generator for cloze, definition and true/false questions.
+
+    Results are deterministic for the same notes (the random source is seeded
+    from a hash of the notes) so repeated requests produce the same deck.
+    """
+
+    engine = 'local'
+
+    def __init__(self, max_terms: int = 40):
+        self.max_terms = max_terms
+
+    def generate_questions(self, notes: str, num_questions: int = 5) -> Optional[List[Dict]]:
+        """
+        Generate study questions from provided notes without any network call
+
+        Args:
+            notes: Text content to generate questions from
+            num_questions: Number of questions to generate (default: 5)
+
+        Returns:
+            List of question dictionaries or None if the notes are too thin
+        """
+        sentences = split_sentences(notes or '')
+        terms = extract_key_terms(sentences, self.max_terms)
+        if not sentences or len(terms) < 2:
+            return None
+
+        rng = random.Random(hashlib.sha256((notes or '').encode('utf-8')).digest())
+        patterns = {key: re.compile(r'\b' + re.escape(key) + r'\b', re.IGNORECASE) for key, _ in terms}
+        display = dict(terms)
+        keys = [key for key, _ in terms]
+
+        questions = []
+        used_sentences = set()
+        builders = (self._cloze, self._true_false, self._definition)
+
+        # Walk the terms by rank, rotating question styles, until enough questions exist
+        for rank, key in enumerate(keys * 2):
+            if len(questions) >= num_questions:
+                break
+
+            for index, sentence in enumerate(sentences):
+                if index in used_sentences or not patterns[key].search(sentence):
+                    continue
+
+                others = [other for other in keys if other != key and not patterns[other].search(sentence)]
+                style = builders[(len(questions) + rank) % len(builders)]
+                question = style(sentence, key, display, patterns[key], others, rng) \
+                    or self._cloze(sentence, key, display, patterns[key], others, rng) \
+                    or self._true_false(sentence, key, display, patterns[key], others, rng)
+
+                if question:
+                    question['topic'] = display[keys[0]][:100]
+                    questions.append(question)
+                    used_sentences.add(index)
+                break
+
+        return questions or None
+
+    @staticmethod
+    def _distractors(others: List[str], key: str, rng: random.Random, count: int = 3) -> List[str]:
+        # Prefer terms with the same number of words so options look alike
+        same_shape = [other for other in others if other.count(' ') == key.count(' ')]
+        pool = same_shape if len(same_shape) >= count else others
+        return rng.sample(pool[:12], min(count, len(pool[:12])))
+
+    def _options(self, key: str, display: Dict[str, str], others: List[str], rng: random.Random):
+        distractors = self._distractors(others, key, rng)
+        if len(distractors) < 3:
+            return None
+        options = [display[key]] + [display[other] for other in distractors]
+        rng.shuffle(options)
+        return options
+
+    def _cloze(self, sentence, key, display, pattern, others, rng) -> Optional[Dict]:
+        options = self._options(key, display, others, rng)
+        if not options:
+            return None
+        return {
+            'question': f"Fill in the blank: {pattern.sub('_____', sentence, count=1)}",
+            'type': 'multiple-choice',
+            'options': options,
+            'correct_answer': display[key],
+            'explanation': sentence,
+            'difficulty_level': 'medium'
+        }
+
+    def _definition(self, sentence, key, display, pattern, others, rng) -> Optional[Dict]:
+        match = _DEFINITION_RE.match(sentence)
+        if not match or not pattern.search(match.group('term')) or pattern.search(match.group('rest')):
+            return None
+        options = self._options(key, display, others, rng)
+        if not options:
+            return None
+        rest = match.group('rest').rstrip('.')
+        return {
+            'question': f"Which term is described as: {rest}?",
+            'type': 'multiple-choice',
+            'options': options,
+            'correct_answer': display[key],
+            'explanation': sentence,
+            'difficulty_level': 'easy'
+        }
+
+    def _true_false(self, sentence, key, display, pattern, others, rng) -> Optional[Dict]:
+        statement, answer = sentence, 'True'
+        if others and rng.random() < 0.5:
+            swap = rng.choice(others[:12])
+            statement, answer = pattern.sub(display[swap], sentence, count=1), 'False'
+        return {
+            'question': f"True or false: {statement}",
+            'type': 'true-false',
+            'options': ['True', 'False'],
+            'correct_answer': answer,
+            'explanation': sentence if answer == 'False' else f"This statement is true: {sentence}",
+            'difficulty_level': 'easy'
+        }
@@ -0,0 +1,201 @@
+"""
+In-process metrics exposed in the Prometheus text format.
+
+Recording has to stay off the request hot path, so every thread writes to
+its own shard (plain dicts reached through ``threading.local``). No lock is
+taken after a thread's first write. A scrape walks all shards and sums them;
+values read mid-update are at most one observation behind, which is fine for
+monitoring. Shards of threads that have finished (thread-per-request servers
+start one per request) are folded into a retired total and dropped, on scrape
+and whenever the shard list doubles, so their number tracks live threads.
+
+Gauges whose values live elsewhere (cache statistics, pool usage) are
+registered as collector callbacks that run only at scrape time.
+"""
+
+import bisect
+import math
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.pool import QueuePool
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+UPSTREAM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def _merge_into(target: Dict, shard: Dict):
+    for key, value in list(shard.items()):
+        if isinstance(value, list):
+            total = target.get(key)
+            target[key] = list(value) if total is None else [a + b for a, b in zip(total, value)]
+        else:
+            target[key] = target.get(key, 0.0) + value
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """Counters and histograms with per-thread shards, plus scrape-time gauges"""
+
+    def __init__(self):
+        self._definitions = {}
+        self._collectors = []
+        self._shards = []  # (weakref to the owning thread, shard)
+        self._retired = {}  # totals of shards whose thread has finished
+        self._compact_at = 64
+        self._local = threading.local()
+        self._lock = threading.Lock()  # only for registering shards/definitions
+
+    def counter(self, name: str, help_text: str):
+        self._definitions[name] = ('counter', help_text, None)
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self._definitions[name] = ('histogram', help_text, tuple(buckets))
+
+    def collector(self, fn: Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]):
+        """Register fn() -> [(name, type, help, labels, value), ...], called on scrape"""
+        with self._lock:
+            self._collectors.append(fn)
+
+    def _shard(self) -> Dict:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+                if len(self._shards) >= self._compact_at:
+                    self._compact()
+                    self._compact_at = max(64, 2 * len(self._shards))
+        return shard
+
+    def _compact(self):
+        """Fold the shards of finished threads into the retired totals (lock held)"""
+        live = []
+        for thread_ref, shard in self._shards:
+            thread = thread_ref()
+            if thread is not None and thread.is_alive():
+                live.append((thread_ref, shard))
+            else:
+                _merge_into(self._retired, shard)
+        self._shards = live
+
+    def inc(self, name: str, amount: float = 1.0, **labels):
+        shard = self._shard()
+        key = (name, tuple(sorted(labels.items())))
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def observe(self, name: str, value: float, **labels):
+        buckets = self._definitions[name][2]
+        shard = self._shard()
+        key = (name, tuple(sorted(labels.items())))
+        series = shard.get(key)
+        if series is None:
+            # [per-bucket counts..., +Inf count, sum]
+            series = shard[key] = [0] * (len(buckets) + 1) + [0.0]
+        series[bisect.bisect_left(buckets, value)] += 1
+        series[-1] += value
+
+    def _merged(self) -> Dict:
+        with self._lock:
+            self._compact()
+            shards = [shard for _, shard in self._shards]
+            merged = {}
+            _merge_into(merged, self._retired)
+
+        for shard in shards:
+            _merge_into(merged, shard)
+        return merged
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)"""
+        by_name = {}
+        for (name, labels), value in self._merged().items():
+            by_name.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name, (kind, help_text, buckets) in sorted(self._definitions.items()):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in sorted(by_name.get(name, [])):
+                if kind == 'counter':
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+                    continue
+
+                cumulative = 0
+                for bound, count in zip(buckets + (math.inf,), value[:-1]):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_format_labels(labels, ("le", _format_value(bound)))} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(value[-1])}')
+                lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+
+        gauges = {}
+        for fn in list(self._collectors):
+            try:
+                samples = list(fn())
+            except Exception:
+                continue  # a broken collector must not break the scrape
+            for name, kind, help_text, labels, value in samples:
+                entry = gauges.setdefault(name, (kind, help_text, []))
+                entry[2].append((tuple(sorted(labels.items())), value))
+
+        for name, (kind, help_text, samples) in sorted(gauges.items()):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def timed_pool_class(registry: MetricsRegistry, metric: str = 'db_pool_checkout_wait_seconds'):
+    """QueuePool subclass that records how long each connection checkout waited"""
+
+    class TimedQueuePool(QueuePool):
+
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                registry.observe(metric, time.perf_counter() - started)
+
+    return TimedQueuePool
+
+
+def pool_samples(pool) -> List[Tuple[str, str, str, Dict[str, str], float]]:
+    """Scrape-time gauges for a SQLAlchemy QueuePool"""
+    if not isinstance(pool, QueuePool):
+        return []
+    return [
+        ('db_pool_size', 'gauge', 'Configured connection pool size', {}, pool.size()),
+        ('db_pool_connections', 'gauge', 'Pooled database connections by state',
+         {'state': 'checked_out'}, pool.checkedout()),
+        ('db_pool_connections', 'gauge', 'Pooled database connections by state',
+         {'state': 'idle'}, pool.checkedin()),
+        ('db_pool_connections', 'gauge', 'Pooled database connections by state',
+         {'state': 'overflow'}, max(0, pool.overflow())),
+    ]
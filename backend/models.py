@@ -20,9 +20,9 @@ class User(db.Model):
     language = db.Column(db.String(10), default='en')
     
     # Timestamps
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    last_activity = db.Column(db.DateTime, default=datetime.utcnow)
+    last_activity = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     last_login = db.Column(db.DateTime)
     
     # Study statistics
@@ -33,6 +33,9 @@ class User(db.Model):
     longest_streak = db.Column(db.Integer, default=0)
     total_study_time = db.Column(db.Integer, default=0)  # in minutes
     
+    # Bumped by every write to the user's decks or cards; the deck list ETag
+    deck_list_version = db.Column(db.Integer, default=0, nullable=False, server_default='0')
+    
     # Relationships
     decks = db.relationship('Deck', backref='user', lazy=True, cascade='all, delete-orphan')
     sessions = db.relationship('StudySession', backref='user', lazy=True, cascade='all, delete-orphan')
@@ -74,9 +77,9 @@ class Deck(db.Model):
     notes_hash = db.Column(db.String(64))  # For detecting changes
     
     # Metadata
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    last_studied = db.Column(db.DateTime)
+    last_studied = db.Column(db.DateTime, index=True)
     
     # Progress tracking
     progress = db.Column(db.Float, default=0.0)  # Percentage completed
@@ -96,6 +99,11 @@ class Deck(db.Model):
     cards = db.relationship('Flashcard', backref='deck', lazy=True, cascade='all, delete-orphan')
     sessions = db.relationship('StudySession', backref='deck', lazy=True, cascade='all, delete-orphan')
     
+    __table_args__ = (
+        # Deck listing: a user's active decks, newest first
+        db.Index('idx_decks_user_archived_created', 'user_id', 'is_archived', 'created_at'),
+    )
+    
     def __repr__(self):
         return f'<Deck {self.title}>'
     
@@ -144,14 +152,19 @@ class Flashcard(db.Model):
     # Study tracking
     times_studied = db.Column(db.Integer, default=0)
     times_correct = db.Column(db.Integer, default=0)
-    last_studied = db.Column(db.DateTime)
+    last_studied = db.Column(db.DateTime, index=True)
     mastery_level = db.Column(db.Float, default=0.0)  # 0-1 scale
     
-    # Spaced repetition
-    next_review = db.Column(db.DateTime)
+    # Spaced repetition (SM-2, see scheduler.py); new cards are due immediately
+    next_review = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     review_interval = db.Column(db.Integer, default=1)  # days
     ease_factor = db.Column(db.Float, default=2.5)
     
+    __table_args__ = (
+        # Due-card queue: cards of a deck ordered by next review
+        db.Index('idx_flashcards_deck_next_review', 'deck_id', 'next_review'),
+    )
+    
     def __repr__(self):
         return f'<Flashcard {self.question[:50]}...>'
     
@@ -181,7 +194,7 @@ class StudySession(db.Model):
     deck_id = db.Column(db.String(36), db.ForeignKey('decks.id'), nullable=False, index=True)
     
     # Session timing
-    started_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     completed_at = db.Column(db.DateTime)
     duration_minutes = db.Column(db.Integer, default=0)
     
@@ -194,6 +207,11 @@ class StudySession(db.Model):
     session_type = db.Column(db.String(50), default='study')  # study, review, test
     device_type = db.Column(db.String(50))  # mobile, desktop, tablet
     
+    __table_args__ = (
+        # Recent completed sessions per user (stats, streaks)
+        db.Index('idx_study_sessions_user_completed', 'user_id', 'completed_at'),
+    )
+    
     def __repr__(self):
         return f'<StudySession {self.id}>'
     
@@ -210,6 +228,36 @@ class StudySession(db.Model):
             'session_type': self.session_type
         }
 
+class UserDailyStats(db.Model):
+    __tablename__ = 'user_daily_stats'
+    
+    # One row per user per calendar day (in the user's timezone)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    
+    sessions = db.Column(db.Integer, default=0, nullable=False)
+    cards_studied = db.Column(db.Integer, default=0, nullable=False)
+    cards_correct = db.Column(db.Integer, default=0, nullable=False)
+    accuracy_total = db.Column(db.Float, default=0.0, nullable=False)  # sum of session accuracies
+    minutes = db.Column(db.Integer, default=0, nullable=False)
+    
+    # Length of the daily study streak ending on this day
+    streak = db.Column(db.Integer, default=1, nullable=False)
+    
+    def __repr__(self):
+        return f'<UserDailyStats {self.user_id} {self.day}>'
+
+class DeckQuotaUsage(db.Model):
+    __tablename__ = 'deck_quota_usage'
+    
+    # Decks created per user per UTC day; the quota window sums these rows
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    decks = db.Column(db.Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f'<DeckQuotaUsage {self.user_id} {self.day}>'
+
 class Payment(db.Model):
     __tablename__ = 'payments'
     
@@ -250,6 +298,56 @@ class Payment(db.Model):
             'subscription_type': self.subscription_type
         }
 
+class GenerationJob(db.Model):
+    __tablename__ = 'generation_jobs'
+    
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
+    deck_id = db.Column(db.String(36), db.ForeignKey('decks.id'))
+    
+    # Request
+    notes = db.Column(db.Text, nullable=False)
+    num_questions = db.Column(db.Integer, default=5)
+    engine = db.Column(db.String(20), default='ai')  # ai, local
+    
+    # Status tracking
+    status = db.Column(db.String(20), default='queued', nullable=False)  # queued, running, done, failed
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<GenerationJob {self.id} {self.status}>'
+    
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'deck_id': self.deck_id,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+class GenerationCacheEntry(db.Model):
+    __tablename__ = 'generation_cache'
+    
+    # sha256(model, num_questions, normalized notes)
+    cache_key = db.Column(db.String(64), primary_key=True)
+    model = db.Column(db.String(255), nullable=False)
+    num_questions = db.Column(db.Integer, nullable=False)
+    questions = db.Column(db.JSON, nullable=False)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    last_hit_at = db.Column(db.DateTime)
+    hit_count = db.Column(db.Integer, default=0)
+    
+    def __repr__(self):
+        return f'<GenerationCacheEntry {self.cache_key[:12]}>'
+
 # Database utility functions
 def init_db(app):
     """Initialize database with app context"""
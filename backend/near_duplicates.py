@@ -0,0 +1,472 @@
+"""
+Near-duplicate question detection with MinHash and LSH.
+
+Questions are compared by the Jaccard similarity of their shingle sets.
+The shingles are the character 4-grams of each normalized word, padded
+with spaces. Function words ("what", "is", "the"...) are left out, because
+they make up most of a question's phrasing and would make unrelated
+questions look alike. Word order does not matter, and a changed word ending
+("produce"/"produced") only costs a few shingles. Two questions at or above
+the threshold (0.7 by default) are near-duplicates.
+
+Each question gets a 64-value MinHash signature. It is computed with one
+permutation and rotation densification, which costs a single hash per
+shingle. The signature is cut into 16 bands of 4 values, and each band
+hashes to a 64-bit bucket key. A band takes every 16th value rather than 4
+neighbouring ones, because densification copies values into neighbouring
+bins. Questions that share any bucket become candidates. A pair at
+similarity 0.7 shares a bucket with probability ~0.99, a pair at 0.5 with
+~0.64 and a pair at 0.3 with ~0.12. Candidates are then checked against the
+exact Jaccard similarity. The buckets only decide which few cards get
+compared; they never decide whether two cards are duplicates.
+
+NearDuplicateIndex keeps each user's bucket keys in a table with the
+columns (user_id, bucket, card_id). A lookup is then one index probe per
+bucket instead of a pass over all of the user's cards. The table is written
+by a background job after the request commits, so saving cards costs no
+extra writes on the request path.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import Counter, defaultdict
+from functools import lru_cache
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+
+from bulk_insert import insert_rows
+from chunking import question_signature
+from jobs import JobQueueFull
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 4
+NUM_HASHES = 64
+BANDS = 16
+ROWS = NUM_HASHES // BANDS
+DEFAULT_THRESHOLD = 0.7
+
+# Cards compared exactly per question at most, those sharing the most bands first
+MAX_CANDIDATES = 200
+# Bucket keys / card ids per IN (...) list
+KEY_BATCH = 500
+
+STOPWORDS = frozenset(
+    'a an and are as at be been by can could did do does for from had has have how if in into is it its of on '
+    'or than that the their them then there these they this those to was were what when where which who whom '
+    'whose why will with would describe explain name'.split()
+)
+
+_BIN_BITS = NUM_HASHES.bit_length() - 1
+_MASK64 = (1 << 64) - 1
+_MIX = 0x9E3779B97F4A7C15  # odd 64-bit multiplier (golden ratio)
+
+
+def shingles(text: str) -> FrozenSet[str]:
+    """Character 4-grams of each normalized content word, padded with spaces"""
+    words = question_signature({'question': text}).split()
+    # A question of nothing but function words keeps them all
+    words = [word for word in words if word not in STOPWORDS] or words
+    grams = set()
+    for word in words:
+        padded = f' {word} '
+        grams.update(padded[i:i + SHINGLE_SIZE] for i in range(max(1, len(padded) - SHINGLE_SIZE + 1)))
+    return frozenset(grams)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+@lru_cache(maxsize=1 << 16)
+def _hash64(gram: str) -> int:
+    # Shingles repeat across questions, so most lookups are cache hits
+    return int.from_bytes(hashlib.blake2b(gram.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def signature(grams: Iterable[str]) -> Optional[Tuple[int, ...]]:
+    """One-permutation MinHash signature of a shingle set (None when empty)"""
+    bins = {}
+    for gram in grams:
+        value = _hash64(gram)
+        slot = value & (NUM_HASHES - 1)
+        value >>= _BIN_BITS
+        if value < bins.get(slot, value + 1):
+            bins[slot] = value
+    if not bins:
+        return None
+
+    # Rotation densification: an empty bin takes the value of the next filled
+    # bin to its right, tagged with the distance so borrowed values only match
+    # bins that borrowed from the same distance
+    result = [0] * NUM_HASHES
+    filled = sorted(bins)
+    previous = filled[-1] - NUM_HASHES
+    for slot in filled:
+        base = bins[slot] << _BIN_BITS
+        for empty in range(previous + 1, slot + 1):
+            result[empty % NUM_HASHES] = base | (slot - empty)
+        previous = slot
+    return tuple(result)
+
+
+def band_keys(sig: Sequence[int]) -> List[int]:
+    """One signed 64-bit bucket key per band (fits a BIGINT column)"""
+    keys = []
+    for band in range(BANDS):
+        # The values are already uniform hashes, so mixing them is enough
+        key = band + 1
+        for value in sig[band::BANDS]:
+            key = ((key * _MIX) ^ value) & _MASK64
+        keys.append(key - (1 << 64) if key >> 63 else key)
+    return keys
+
+
+class Fingerprint(NamedTuple):
+    shingles: FrozenSet[str]
+    keys: List[int]  # empty for a question without words
+
+
+def fingerprint(text: str) -> Fingerprint:
+    grams = shingles(text)
+    sig = signature(grams)
+    return Fingerprint(grams, band_keys(sig) if sig else [])
+
+
+class LSHIndex:
+    """In-memory buckets, for comparing the questions of one request with each other"""
+
+    def __init__(self):
+        self._buckets = defaultdict(list)
+
+    def add(self, item, keys: Iterable[int]):
+        for key in keys:
+            self._buckets[key].append(item)
+
+    def candidates(self, keys: Iterable[int]) -> List:
+        """Items sharing a bucket with ``keys``, most shared buckets first"""
+        shared = Counter()
+        for key in keys:
+            shared.update(self._buckets.get(key, ()))
+        return [item for item, _ in shared.most_common(MAX_CANDIDATES)]
+
+
+class Screening(NamedTuple):
+    kept: List[Dict]
+    fingerprints: Optional[List[Fingerprint]]  # of the kept questions, in the same order
+    duplicates: List[Dict]
+    matches: List[str]  # ids of the user's cards that dropped questions repeat
+
+
+class IndexBuilding(Exception):
+    """Raised when a lookup needs the whole library indexed and the backfill is still running"""
+
+
+class NearDuplicateIndex:
+    """
+    Per-user near-duplicate lookups backed by an LSH bucket table.
+
+    ``bucket_model`` has columns user_id, bucket and card_id; ``state_model``
+    (user_id, indexed_at) marks users whose cards are all in it.
+    ``card_model`` and ``deck_model`` are Flashcard and Deck.
+
+    Requests only read the index. Bucket rows are written by ``runner`` (a
+    JobRunner) after the request's transaction commits. The cards of a
+    generated deck are written from the fingerprints screening already
+    computed. Any other card is picked up by a backfill, one deck at a time:
+    imported cards, cards saved while detection was off, and cards from
+    before the index existed. Until a user's backfill has finished, new
+    questions are compared only with the cards indexed so far.
+
+    With ``enabled`` off, nothing is fingerprinted or indexed. Saving cards
+    then clears the user's state row, so turning detection back on
+    rebuilds the index through the backfill.
+    """
+
+    def __init__(self, db, bucket_model, state_model, card_model, deck_model,
+                 threshold: float = DEFAULT_THRESHOLD, enabled: bool = True, runner=None):
+        self.db = db
+        self.bucket_model = bucket_model
+        self.state_model = state_model
+        self.card_model = card_model
+        self.deck_model = deck_model
+        self.threshold = threshold
+        self.enabled = enabled
+        self.runner = runner
+
+        self._lock = threading.Lock()
+        self._queued = defaultdict(list)  # user id -> bucket rows waiting for the runner
+        self._active = set()              # users with an indexing job queued or running
+        self._counters = {'screened': 0, 'dropped': 0, 'compared': 0, 'indexed_cards': 0,
+                          'backfilled_users': 0, 'backfilled_cards': 0, 'schedule_failures': 0}
+
+        # Indexing starts only once the cards it refers to are committed
+        event.listen(db.session, 'after_commit', self._after_commit)
+        event.listen(db.session, 'after_rollback', self._after_rollback)
+
+    def _count(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                self._counters[name] += amount
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._counters, enabled=self.enabled, threshold=self.threshold,
+                        indexing_users=len(self._active))
+
+    # -- Index maintenance
+
+    def index_rows(self, user_id: str, card_ids: Sequence[str], fingerprints: Sequence[Fingerprint]) -> List[Dict]:
+        return [{'user_id': user_id, 'bucket': key, 'card_id': card_id}
+                for card_id, fp in zip(card_ids, fingerprints)
+                for key in set(fp.keys)]
+
+    def cards_saved(self, user_id: str, card_ids: Sequence[str] = (),
+                    fingerprints: Optional[Sequence[Fingerprint]] = None):
+        """
+        Queue indexing of new cards once the caller commits.
+
+        Pass the fingerprints screen() returned for a generated deck. Without
+        them (imports), the user is marked for a backfill instead.
+        """
+        if not self.enabled or fingerprints is None:
+            # One primary-key DELETE; the backfill finds whatever is missing
+            session = self.db.session
+            session.query(self.state_model).filter_by(user_id=user_id).delete(synchronize_session=False)
+            if not self.enabled:
+                return
+            rows = []
+        else:
+            rows = self.index_rows(user_id, card_ids, fingerprints)
+        pending = self.db.session.info.setdefault('near_duplicate_pending', {})
+        pending.setdefault(user_id, []).extend(rows)
+
+    def remove(self, card_ids: Sequence[str]):
+        bucket = self.bucket_model
+        for start in range(0, len(card_ids), KEY_BATCH):
+            self.db.session.query(bucket).filter(
+                bucket.card_id.in_(card_ids[start:start + KEY_BATCH])
+            ).delete(synchronize_session=False)
+
+    def is_indexed(self, user_id: str) -> bool:
+        return self.db.session.get(self.state_model, user_id) is not None
+
+    def _after_commit(self, session):
+        for user_id, rows in session.info.pop('near_duplicate_pending', {}).items():
+            self.schedule(user_id, rows)
+
+    def _after_rollback(self, session):
+        session.info.pop('near_duplicate_pending', None)
+
+    def schedule(self, user_id: str, rows: Sequence[Dict] = ()):
+        """Hand bucket rows (and a backfill check) for one user to the runner"""
+        with self._lock:
+            self._queued[user_id].extend(rows)
+            if user_id in self._active:
+                return  # the running job picks the rows up before it exits
+            self._active.add(user_id)
+        try:
+            self.runner.submit(self.index_user, user_id)
+        except JobQueueFull:
+            # The rows stay queued and go with the user's next job
+            with self._lock:
+                self._active.discard(user_id)
+                self._counters['schedule_failures'] += 1
+            logger.warning(f"Near-duplicate indexing queue is full; user {user_id} will be indexed later")
+
+    def index_user(self, user_id: str):
+        """Runner job: write queued bucket rows, then backfill the user if needed"""
+        try:
+            while True:
+                with self._lock:
+                    rows = self._queued.pop(user_id, [])
+                if rows:
+                    self._insert_queued(user_id, rows)
+                if not self.is_indexed(user_id):
+                    self.backfill(user_id)
+                with self._lock:
+                    if not self._queued.get(user_id):
+                        self._queued.pop(user_id, None)
+                        self._active.discard(user_id)
+                        return
+        except Exception:
+            with self._lock:
+                self._active.discard(user_id)
+            raise
+
+    def _insert_queued(self, user_id: str, rows: List[Dict]):
+        session = self.db.session
+        try:
+            insert_rows(session, self.bucket_model.__table__, rows)
+            session.commit()
+            self._count(indexed_cards=len({row['card_id'] for row in rows}))
+        except IntegrityError:
+            # A card was deleted (or indexed) meanwhile; let the backfill sort it out
+            session.rollback()
+            session.query(self.state_model).filter_by(user_id=user_id).delete(synchronize_session=False)
+            session.commit()
+
+    def backfill(self, user_id: str):
+        """
+        Index every card of the user that has no bucket rows, committing every
+        ``KEY_BATCH`` cards, then record the user as indexed.
+        """
+        session = self.db.session
+        card, deck, bucket = self.card_model, self.deck_model, self.bucket_model
+        deck_ids = session.execute(select(deck.id).where(deck.user_id == user_id)).scalars().all()
+
+        indexed = 0
+        for deck_id in deck_ids:
+            # Anti-join: the deck's cards without bucket rows
+            rows = session.execute(
+                select(card.id, card.question)
+                .outerjoin(bucket, bucket.card_id == card.id)
+                .where(card.deck_id == deck_id, bucket.card_id.is_(None))
+            ).all()
+            for start in range(0, len(rows), KEY_BATCH):
+                batch = rows[start:start + KEY_BATCH]
+                insert_rows(session, bucket.__table__, self.index_rows(
+                    user_id, [row.id for row in batch], [fingerprint(row.question) for row in batch]
+                ))
+                # Short transactions keep the write lock free for requests
+                session.commit()
+            indexed += len(rows)
+
+        try:
+            session.add(self.state_model(user_id=user_id, indexed_at=datetime.utcnow()))
+            session.commit()
+        except IntegrityError:
+            session.rollback()  # Recorded by another worker
+        self._count(backfilled_users=1, backfilled_cards=indexed)
+
+    # -- Lookups
+
+    def _bucket_members(self, user_id: str, keys: Iterable[int]) -> Dict[int, List[str]]:
+        """Card ids of the user in each of ``keys``"""
+        bucket = self.bucket_model
+        keys = list(keys)
+        members = defaultdict(list)
+        for start in range(0, len(keys), KEY_BATCH):
+            rows = self.db.session.execute(
+                select(bucket.bucket, bucket.card_id)
+                .where(bucket.user_id == user_id, bucket.bucket.in_(keys[start:start + KEY_BATCH]))
+            )
+            for key, card_id in rows:
+                members[key].append(card_id)
+        return members
+
+    def _card_shingles(self, card_ids: Iterable[str]) -> Dict[str, FrozenSet[str]]:
+        card = self.card_model
+        card_ids = list(card_ids)
+        found = {}
+        for start in range(0, len(card_ids), KEY_BATCH):
+            rows = self.db.session.execute(
+                select(card.id, card.question).where(card.id.in_(card_ids[start:start + KEY_BATCH]))
+            )
+            found.update((row.id, shingles(row.question)) for row in rows)
+        return found
+
+    @staticmethod
+    def _ranked(members: Dict[int, List[str]], keys: Iterable[int], exclude=()) -> List[str]:
+        shared = Counter()
+        for key in keys:
+            shared.update(card_id for card_id in members.get(key, ()) if card_id not in exclude)
+        return [card_id for card_id, _ in shared.most_common(MAX_CANDIDATES)]
+
+    def _best_match(self, grams: FrozenSet[str], candidates: Iterable, texts) -> Tuple[Optional[str], float]:
+        best, best_similarity, compared = None, 0.0, 0
+        # Jaccard similarity is at most the ratio of the two set sizes
+        low, high = len(grams) * self.threshold, len(grams) / self.threshold if self.threshold else float('inf')
+        for candidate in candidates:
+            other = texts.get(candidate)
+            if other is None or not low <= len(other) <= high:
+                continue
+            compared += 1
+            similarity = jaccard(grams, other)
+            if similarity >= self.threshold and similarity > best_similarity:
+                best, best_similarity = candidate, similarity
+        self._count(compared=compared)
+        return best, best_similarity
+
+    def screen(self, user_id: str, questions: List[Dict]) -> Screening:
+        """
+        Split generated questions into those to keep and near-duplicates.
+
+        A question is dropped when it matches one of the user's indexed cards
+        or an earlier question of the same batch. With detection off every
+        question is kept and ``fingerprints`` is None.
+        """
+        if not self.enabled:
+            return Screening(list(questions), None, [], [])
+
+        fingerprints = [fingerprint(question.get('question', '')) for question in questions]
+        members = self._bucket_members(user_id, {key for fp in fingerprints for key in fp.keys})
+        candidates = [self._ranked(members, fp.keys) for fp in fingerprints]
+        texts = self._card_shingles({card_id for ids in candidates for card_id in ids})
+
+        batch = LSHIndex()
+        kept, kept_fingerprints, duplicates, matches = [], [], [], []
+        for question, fp, card_ids in zip(questions, fingerprints, candidates):
+            match, _ = self._best_match(fp.shingles, card_ids, texts)
+            if match is not None:
+                matches.append(match)
+            else:
+                earlier = {n: kept_fingerprints[n].shingles for n in batch.candidates(fp.keys)}
+                match, _ = self._best_match(fp.shingles, earlier, earlier)
+            if match is not None:
+                duplicates.append(question)
+                continue
+            batch.add(len(kept), fp.keys)
+            kept.append(question)
+            kept_fingerprints.append(fp)
+
+        self._count(screened=len(questions), dropped=len(duplicates))
+        return Screening(kept, kept_fingerprints, duplicates, matches)
+
+    def duplicate_groups(self, user_id: str, cards: Sequence[Tuple[str, str]], library: bool = False) -> List[Dict]:
+        """
+        Near-duplicate groups among ``cards`` ((id, question) pairs of one deck).
+
+        Cards are taken in the order given, and a card is a duplicate of the
+        most similar card kept before it. With ``library`` set, the user's
+        cards in other decks are kept first, so a deck card that repeats any
+        of them is a duplicate too; that needs the user's backfill to have
+        finished, so IndexBuilding is raised (and the backfill scheduled)
+        until it has. Returns ``{'kept': id, 'duplicates': [{'id',
+        'similarity'}]}`` groups.
+        """
+        if library and not self.is_indexed(user_id):
+            self.schedule(user_id)
+            raise IndexBuilding('The library is still being indexed for duplicate detection')
+
+        fingerprints = {card_id: fingerprint(question) for card_id, question in cards}
+
+        outside, texts = {}, {}
+        if library:
+            members = self._bucket_members(user_id, {key for fp in fingerprints.values() for key in fp.keys})
+            outside = {card_id: self._ranked(members, fp.keys, exclude=fingerprints)
+                       for card_id, fp in fingerprints.items()}
+            texts = self._card_shingles({other for ids in outside.values() for other in ids})
+
+        kept = LSHIndex()
+        kept_texts = {}
+        groups = {}
+        for card_id, _ in cards:
+            fp = fingerprints[card_id]
+            match, similarity = self._best_match(fp.shingles, outside.get(card_id, ()), texts)
+            if match is None:
+                match, similarity = self._best_match(fp.shingles, kept.candidates(fp.keys), kept_texts)
+            if match is None:
+                kept.add(card_id, fp.keys)
+                kept_texts[card_id] = fp.shingles
+                continue
+            groups.setdefault(match, []).append({'id': card_id, 'similarity': round(similarity, 4)})
+
+        return [{'kept': card_id, 'duplicates': duplicates} for card_id, duplicates in groups.items()]
@@ -0,0 +1,64 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Lists are ordered by (created_at DESC, id DESC). The cursor is the sort key of
+the last row on the page, so the next page is a range scan that starts right
+after it instead of an OFFSET that re-reads every earlier row. Cursors are
+opaque URL-safe strings for clients.
+
+Ranked lists (search) have no stable sort key to resume from, so their
+cursors carry the position of the next row instead.
+"""
+
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor that was not issued by the API"""
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, str]]:
+    """Return (created_at, id) for a cursor, or None when no cursor was sent"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        created_at, row_id = raw.split('|', 1)
+        return datetime.fromisoformat(created_at), row_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor('Invalid cursor') from e
+
+
+def encode_offset_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(f'offset|{offset}'.encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_offset_cursor(cursor: Optional[str]) -> int:
+    """Return the offset of a ranked-list cursor, 0 when no cursor was sent"""
+    if not cursor:
+        return 0
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii')
+        kind, offset = raw.split('|', 1)
+        if kind != 'offset' or int(offset) < 0:
+            raise ValueError(raw)
+        return int(offset)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor('Invalid cursor') from e
+
+
+def parse_limit(value: Optional[str], default: Optional[int], maximum: int) -> Optional[int]:
+    """Clamp a ``limit`` query parameter to 1..maximum (``default`` when absent)"""
+    if value in (None, ''):
+        return default
+    try:
+        return max(1, min(maximum, int(value)))
+    except ValueError:
+        return default
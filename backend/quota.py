@@ -0,0 +1,163 @@
+"""
+Monthly deck quota.
+
+Deck creations are counted in one row per user per UTC day, so usage over
+the rolling window (30 days by default) is a sum over at most 30 primary-key
+rows instead of a range scan of the decks table. The count is also kept in a
+small in-process TTL cache, which makes the pre-generation check free for
+most requests.
+
+The cache only decides whether generation is worth starting. The
+authoritative check is ``reserve()``, which runs in the transaction that
+creates the deck. It increments today's bucket first and then re-reads usage
+from the database, so two parallel requests cannot both take the last free
+deck.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, NamedTuple, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+
+class QuotaExceeded(Exception):
+    """Raised by ``reserve()`` when the user has no decks left in the window"""
+
+    def __init__(self, used: int, limit: int):
+        super().__init__(f'Deck quota reached ({used}/{limit})')
+        self.used = used
+        self.limit = limit
+
+
+class QuotaStatus(NamedTuple):
+    used: int
+    limit: int  # negative means unlimited
+
+    @property
+    def unlimited(self) -> bool:
+        return self.limit < 0
+
+    @property
+    def remaining(self) -> Optional[int]:
+        return None if self.unlimited else max(0, self.limit - self.used)
+
+    @property
+    def allowed(self) -> bool:
+        return self.unlimited or self.used < self.limit
+
+
+class DeckQuota:
+    """
+    Single entry point for monthly deck limits.
+
+    ``usage_model`` has columns user_id, day and decks. Limits follow the tier
+    settings: a negative limit means unlimited.
+    """
+
+    def __init__(self, db, usage_model, free_limit: int = 5, premium_limit: int = -1,
+                 window_days: int = 30, cache_ttl: float = 60.0, max_cached: int = 10000):
+        self.db = db
+        self.usage_model = usage_model
+        self.free_limit = free_limit
+        self.premium_limit = premium_limit
+        self.window_days = window_days
+        self.cache_ttl = cache_ttl
+        self.max_cached = max_cached
+
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._counters = {'cache_hits': 0, 'cache_misses': 0, 'reserved': 0, 'rejected': 0}
+
+    def limit_for(self, user) -> int:
+        return self.premium_limit if user.is_premium else self.free_limit
+
+    def _window_start(self, now: datetime):
+        return (now - timedelta(days=self.window_days - 1)).date()
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _cache_get(self, user_id: str) -> Optional[int]:
+        with self._lock:
+            entry = self._cache.get(user_id)
+            if entry and entry[1] > time.monotonic():
+                self._counters['cache_hits'] += 1
+                return entry[0]
+            self._counters['cache_misses'] += 1
+            return None
+
+    def _cache_put(self, user_id: str, used: int):
+        with self._lock:
+            if len(self._cache) >= self.max_cached and user_id not in self._cache:
+                # Drop expired entries first, then the oldest half if still full
+                now = time.monotonic()
+                self._cache = {key: value for key, value in self._cache.items() if value[1] > now}
+                if len(self._cache) >= self.max_cached:
+                    for key in list(self._cache)[:self.max_cached // 2]:
+                        del self._cache[key]
+            self._cache[user_id] = (used, time.monotonic() + self.cache_ttl)
+
+    def _usage_from_db(self, user_id: str, now: datetime) -> int:
+        model = self.usage_model
+        used = self.db.session.query(self.db.func.sum(model.decks)).filter(
+            model.user_id == user_id,
+            model.day >= self._window_start(now)
+        ).scalar()
+        return int(used or 0)
+
+    def status(self, user, now: Optional[datetime] = None) -> QuotaStatus:
+        """Usage and limit for the user's tier (served from cache when fresh)"""
+        limit = self.limit_for(user)
+        used = self._cache_get(user.id)
+        if used is None:
+            used = self._usage_from_db(user.id, now or datetime.utcnow())
+            self._cache_put(user.id, used)
+        return QuotaStatus(used, limit)
+
+    def reserve(self, user, count: int = 1, now: Optional[datetime] = None) -> QuotaStatus:
+        """
+        Count ``count`` new decks against the user's quota inside the current
+        transaction, or raise QuotaExceeded. The caller commits (or rolls back,
+        which also releases the reservation).
+        """
+        now = now or datetime.utcnow()
+        model = self.usage_model
+        today = now.date()
+
+        # Increment today's bucket first: the row lock (or SQLite's write lock)
+        # it takes serializes concurrent reservations for the same user, so the
+        # sum read afterwards includes every earlier reservation
+        updated = self.db.session.query(model).filter_by(user_id=user.id, day=today).update(
+            {model.decks: model.decks + count}, synchronize_session=False
+        )
+        if not updated:
+            try:
+                with self.db.session.begin_nested():
+                    self.db.session.add(model(user_id=user.id, day=today, decks=count))
+            except IntegrityError:
+                # Another transaction created today's bucket first
+                self.db.session.query(model).filter_by(user_id=user.id, day=today).update(
+                    {model.decks: model.decks + count}, synchronize_session=False
+                )
+
+        limit = self.limit_for(user)
+        used = self._usage_from_db(user.id, now)
+        if limit >= 0 and used > limit:
+            # The caller's rollback undoes the increment
+            self._cache_put(user.id, used - count)
+            self._count('rejected')
+            raise QuotaExceeded(used - count, limit)
+
+        self._cache_put(user.id, used)
+        self._count('reserved')
+        return QuotaStatus(used, limit)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters, cached_users=len(self._cache))
+        lookups = counters['cache_hits'] + counters['cache_misses']
+        counters['cache_hit_ratio'] = round(counters['cache_hits'] / lookups, 4) if lookups else 0.0
+        return counters
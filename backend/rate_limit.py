@@ -0,0 +1,248 @@
+"""
+Admission control for calls to the AI model.
+
+The free-tier model allows a small number of requests per minute. Without a
+limit, a burst of generations produces a wave of upstream 429s that each turn
+into a slow 500. ``UpstreamLimiter`` combines:
+
+- a token bucket for requests per minute
+- a semaphore for calls in flight
+- a bounded wait queue with a deadline
+- fast rejection (``RateLimitExceeded`` carrying a Retry-After) when the queue
+  is full or the deadline cannot be met
+
+By default the limits apply per process. Pointing ``lease_dir`` at a local
+directory shares them between every worker process on the host through
+``fcntl`` file locks.
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call cannot be admitted; ``retry_after`` is in seconds"""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+
+
+class TokenBucket:
+    """In-process token bucket refilled continuously at ``rate_per_minute``"""
+
+    def __init__(self, rate_per_minute: float, capacity: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """Take a token, returning 0, or return the seconds until one is available"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+
+class FileTokenBucket:
+    """Token bucket whose state lives in a locked file shared by all processes"""
+
+    def __init__(self, path: str, rate_per_minute: float, capacity: int):
+        import fcntl  # POSIX only; imported when cross-process limiting is enabled
+        self._fcntl = fcntl
+        self.path = path
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+
+    def try_acquire(self) -> float:
+        with open(self.path, 'a+') as f:
+            self._fcntl.flock(f, self._fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read()
+                now = time.time()
+                try:
+                    state = json.loads(raw)
+                    tokens = min(self.capacity, state['tokens'] + (now - state['updated']) * self.rate)
+                except (ValueError, KeyError):
+                    tokens = float(self.capacity)
+
+                wait = 0.0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / self.rate
+
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps({'tokens': tokens, 'updated': now}))
+                return wait
+            finally:
+                self._fcntl.flock(f, self._fcntl.LOCK_UN)
+
+
+class LocalSlots:
+    """In-flight limit for one process"""
+
+    def __init__(self, slots: int):
+        self._semaphore = threading.BoundedSemaphore(slots)
+
+    def acquire(self, timeout: float):
+        if timeout > 0:
+            acquired = self._semaphore.acquire(timeout=timeout)
+        else:
+            acquired = self._semaphore.acquire(blocking=False)
+        return True if acquired else None
+
+    def release(self, lease):
+        self._semaphore.release()
+
+
+class FileSlots:
+    """In-flight limit shared across processes: one lock file per slot"""
+
+    poll_interval = 0.05
+
+    def __init__(self, directory: str, slots: int):
+        import fcntl
+        self._fcntl = fcntl
+        self.paths = [os.path.join(directory, f'slot-{i}.lock') for i in range(slots)]
+
+    def _try_lease(self):
+        for path in self.paths:
+            f = open(path, 'a')
+            try:
+                self._fcntl.flock(f, self._fcntl.LOCK_EX | self._fcntl.LOCK_NB)
+                return f
+            except OSError:
+                f.close()
+        return None
+
+    def acquire(self, timeout: float):
+        deadline = time.monotonic() + timeout
+        while True:
+            lease = self._try_lease()
+            if lease is not None or time.monotonic() >= deadline:
+                return lease
+            time.sleep(min(self.poll_interval, max(0.0, deadline - time.monotonic())))
+
+    def release(self, lease):
+        self._fcntl.flock(lease, self._fcntl.LOCK_UN)
+        lease.close()
+
+
+class UpstreamLimiter:
+    """
+    Requests-per-minute and concurrency limiter with a bounded wait queue.
+
+    Usage:
+        with limiter.slot():
+            call_the_model()
+    """
+
+    def __init__(self, requests_per_minute: float = 20, burst: int = 5, max_in_flight: int = 4,
+                 max_queue: int = 16, queue_timeout: float = 10.0, lease_dir: str = None):
+        self.requests_per_minute = requests_per_minute
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        if lease_dir:
+            os.makedirs(lease_dir, exist_ok=True)
+            self._bucket = FileTokenBucket(os.path.join(lease_dir, 'bucket.json'), requests_per_minute, burst)
+            self._slots = FileSlots(lease_dir, max_in_flight)
+        else:
+            self._bucket = TokenBucket(requests_per_minute, burst)
+            self._slots = LocalSlots(max_in_flight)
+        self.shared = bool(lease_dir)
+
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._in_flight = 0
+        self._counters = {'admitted': 0, 'rejected_queue_full': 0, 'rejected_deadline': 0}
+
+    def _retry_after(self, ahead: int) -> float:
+        # Every caller ahead of us needs a token from the bucket first
+        return (ahead + 1) * 60.0 / self.requests_per_minute
+
+    def _reject(self, reason: str, message: str, retry_after: float):
+        with self._lock:
+            self._counters[reason] += 1
+        raise RateLimitExceeded(message, retry_after)
+
+    def acquire(self, timeout: float = None):
+        """Wait for admission, returning a lease for release(); raises RateLimitExceeded"""
+        timeout = self.queue_timeout if timeout is None else timeout
+
+        with self._lock:
+            ahead = self._waiting
+            full = ahead >= self.max_queue
+            if not full:
+                self._waiting += 1
+        if full:
+            self._reject('rejected_queue_full', 'AI generation queue is full', self._retry_after(ahead))
+
+        deadline = time.monotonic() + timeout
+        try:
+            lease = self._slots.acquire(max(0.0, deadline - time.monotonic()))
+            if lease is None:
+                self._reject('rejected_deadline', 'Timed out waiting for an AI generation slot',
+                             self._retry_after(ahead))
+
+            while True:
+                wait = self._bucket.try_acquire()
+                if wait == 0:
+                    break
+                if time.monotonic() + wait > deadline:
+                    self._slots.release(lease)
+                    self._reject('rejected_deadline', 'AI generation rate limit reached', wait)
+                time.sleep(wait)
+
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+        with self._lock:
+            self._in_flight += 1
+            self._counters['admitted'] += 1
+        return lease
+
+    def release(self, lease):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release(lease)
+
+    @contextmanager
+    def slot(self, timeout: float = None):
+        lease = self.acquire(timeout)
+        try:
+            yield
+        finally:
+            self.release(lease)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(
+                self._counters,
+                waiting=self._waiting,
+                in_flight=self._in_flight,
+                requests_per_minute=self.requests_per_minute,
+                max_in_flight=self.max_in_flight,
+                max_queue=self.max_queue,
+                shared=self.shared
+            )
@@ -0,0 +1,67 @@
+"""
+SM-2 spaced-repetition scheduling for flashcards.
+
+Each review is graded 0-5. Correct answers (grade >= 3) grow the review
+interval (1 day, then 6 days, then interval x ease factor); lapses send the
+card back for relearning shortly afterwards. The ease factor moves with the
+grade and never drops below 1.3.
+
+``Flashcard`` has no repetition counter, so the SM-2 repetition state is
+carried by ``review_interval``: 0 means new or relearning, 1 means one
+successful review, anything larger is a mature card.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+MIN_EASE_FACTOR = 1.3
+DEFAULT_EASE_FACTOR = 2.5
+RELEARN_DELAY = timedelta(minutes=10)
+MAX_INTERVAL_DAYS = 3650
+
+# Grade used when the client only reports right/wrong plus a difficulty rating
+QUALITY_BY_DIFFICULTY = {'easy': 5, 'medium': 4, 'hard': 3}
+QUALITY_INCORRECT = 1
+
+
+def review_quality(is_correct: bool, difficulty: str = 'medium', quality: Optional[int] = None) -> int:
+    """Resolve the 0-5 SM-2 grade for a review"""
+    if quality is not None:
+        return max(0, min(5, int(quality)))
+    if not is_correct:
+        return QUALITY_INCORRECT
+    return QUALITY_BY_DIFFICULTY.get(difficulty, QUALITY_BY_DIFFICULTY['medium'])
+
+
+def schedule(interval: int, ease_factor: float, quality: int, now: datetime) -> Tuple[int, float, datetime]:
+    """
+    Apply one SM-2 step.
+
+    Returns (review_interval_days, ease_factor, next_review).
+    """
+    ease_factor = ease_factor or DEFAULT_EASE_FACTOR
+    ease_factor = max(MIN_EASE_FACTOR, ease_factor + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)))
+
+    if quality < 3:
+        return 0, ease_factor, now + RELEARN_DELAY
+
+    if not interval or interval < 1:
+        interval = 1
+    elif interval == 1:
+        interval = 6
+    else:
+        interval = min(MAX_INTERVAL_DAYS, int(round(interval * ease_factor)))
+
+    return interval, ease_factor, now + timedelta(days=interval)
+
+
+def apply_review(card, quality: int, now: Optional[datetime] = None):
+    """Update a card's scheduling fields (review_interval, ease_factor, next_review)"""
+    now = now or datetime.utcnow()
+
+    # Cards that have never been reviewed start in the "new" state
+    interval = card.review_interval if card.times_studied else 0
+    card.review_interval, card.ease_factor, card.next_review = schedule(
+        interval, card.ease_factor, quality, now
+    )
+    return card
@@ -0,0 +1,298 @@
+"""
+Full-text search over a user's cards and decks.
+
+Cards are indexed on question, explanation and topic, and decks on title and
+original notes. The index lives in the database, so every write path keeps
+it current, including the bulk INSERTs that bypass the ORM:
+
+* MySQL: FULLTEXT indexes on both tables, maintained by InnoDB.
+* SQLite: FTS5 tables (``flashcards_fts``, ``decks_fts``) kept in step by
+  AFTER INSERT/UPDATE/DELETE triggers. Each row also carries its owner's id
+  as a token, and searches match on it. A search therefore only walks the
+  user's own postings, however many other accounts share the index. Updates
+  only touch the index when an indexed column changes, so review
+  bookkeeping costs nothing.
+
+Both are created by ``db.create_all()``. A database created before search
+existed gets them the next time create_all runs, and SQLite then builds the
+index from the existing rows. Existing MySQL databases can use the migration
+instead.
+
+A query matches cards and decks containing every word. The last word also
+matches as a prefix once it has MIN_PREFIX letters (search as you type).
+Results are ranked together by relevance: BM25 on SQLite, InnoDB's relevance
+on MySQL. Scores are only comparable within one backend.
+"""
+
+import logging
+import re
+from typing import Dict, List, Tuple
+
+from sqlalchemy import event, inspect, text
+
+logger = logging.getLogger(__name__)
+
+# Indexed columns per table
+INDEXED = {
+    'flashcards': ('question', 'explanation', 'topic'),
+    'decks': ('title', 'original_notes'),
+}
+
+MAX_TERMS = 8
+
+# The last word also matches as a prefix from this length; shorter prefixes
+# would expand to a large share of the vocabulary
+MIN_PREFIX = 3
+
+# InnoDB ignores these and words shorter than innodb_ft_min_token_size (3),
+# and a required (+) term it ignores would make every query come back empty
+MYSQL_MIN_TERM = 3
+MYSQL_STOPWORDS = frozenset((
+    'a', 'about', 'an', 'are', 'as', 'at', 'be', 'by', 'com', 'de', 'en', 'for', 'from', 'how', 'i', 'in',
+    'is', 'it', 'la', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'what', 'when', 'where', 'who',
+    'will', 'with', 'und', 'www'
+))
+
+_TERM_RE = re.compile(r'\w+')
+
+
+class SearchUnavailable(Exception):
+    """Raised when the database has no full-text support this module knows"""
+
+
+def search_terms(query: str) -> List[str]:
+    """Lower-cased words of a query (at most MAX_TERMS)"""
+    return _TERM_RE.findall((query or '').lower())[:MAX_TERMS]
+
+
+def owner_token(user_id: str) -> str:
+    """The user id as indexed in the FTS5 owner column (a UUID becomes one token)"""
+    return user_id.replace('-', '')
+
+
+def fts5_query(user_id: str, terms: List[str]) -> str:
+    """
+    ``cell energ`` -> ``owner:"<user>" AND "cell" "energ"*``.
+
+    Every term is quoted, so user input is never read as FTS5 syntax.
+    """
+    words = ' '.join(f'"{term}"' for term in terms)
+    if len(terms[-1]) >= MIN_PREFIX:
+        words += '*'
+    owner = owner_token(user_id).replace('"', '""')
+    return f'owner:"{owner}" AND {words}'
+
+
+def mysql_query(terms: List[str]) -> str:
+    """``cell energy`` -> ``+cell +energy*`` for BOOLEAN MODE; '' when no term is indexable"""
+    terms = [term for term in terms if len(term) >= MYSQL_MIN_TERM and term not in MYSQL_STOPWORDS]
+    if not terms:
+        return ''
+    return ' '.join(f'+{term}' for term in terms) + '*'
+
+
+# FTS5 rowids are the rowids of the indexed rows. VACUUM can renumber those
+# (the tables have string primary keys), so run FullTextSearch.rebuild() after one.
+_FTS5_OPTIONS = "tokenize='unicode61 remove_diacritics 2', prefix='3'"
+_CARD_OWNER = "(SELECT replace(user_id, '-', '') FROM decks WHERE id = new.deck_id)"
+
+_SQLITE_DDL = {
+    'flashcards_fts': [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS flashcards_fts USING fts5("
+        f"owner, question, explanation, topic, {_FTS5_OPTIONS})",
+        f"""CREATE TRIGGER IF NOT EXISTS flashcards_fts_insert AFTER INSERT ON flashcards BEGIN
+            INSERT INTO flashcards_fts(rowid, owner, question, explanation, topic)
+            VALUES (new.rowid, {_CARD_OWNER}, new.question, new.explanation, new.topic);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS flashcards_fts_update
+            AFTER UPDATE OF deck_id, question, explanation, topic ON flashcards BEGIN
+            UPDATE flashcards_fts SET owner = {_CARD_OWNER}, question = new.question,
+                explanation = new.explanation, topic = new.topic
+            WHERE rowid = new.rowid;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS flashcards_fts_delete AFTER DELETE ON flashcards BEGIN
+            DELETE FROM flashcards_fts WHERE rowid = old.rowid;
+        END""",
+    ],
+    'decks_fts': [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS decks_fts USING fts5(owner, title, original_notes, {_FTS5_OPTIONS})",
+        """CREATE TRIGGER IF NOT EXISTS decks_fts_insert AFTER INSERT ON decks BEGIN
+            INSERT INTO decks_fts(rowid, owner, title, original_notes)
+            VALUES (new.rowid, replace(new.user_id, '-', ''), new.title, new.original_notes);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS decks_fts_update AFTER UPDATE OF user_id, title, original_notes ON decks BEGIN
+            UPDATE decks_fts SET owner = replace(new.user_id, '-', ''), title = new.title,
+                original_notes = new.original_notes
+            WHERE rowid = new.rowid;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS decks_fts_delete AFTER DELETE ON decks BEGIN
+            DELETE FROM decks_fts WHERE rowid = old.rowid;
+        END""",
+    ],
+}
+
+_SQLITE_REBUILD = {
+    'flashcards_fts': """
+        INSERT INTO flashcards_fts(rowid, owner, question, explanation, topic)
+        SELECT f.rowid, replace(d.user_id, '-', ''), f.question, f.explanation, f.topic
+        FROM flashcards f JOIN decks d ON d.id = f.deck_id
+    """,
+    'decks_fts': """
+        INSERT INTO decks_fts(rowid, owner, title, original_notes)
+        SELECT rowid, replace(user_id, '-', ''), title, original_notes FROM decks
+    """,
+}
+
+
+def _match(alias: str, table: str) -> str:
+    columns = ', '.join(f'{alias}.{column}' for column in INDEXED[table])
+    return f'MATCH({columns}) AGAINST (:match IN BOOLEAN MODE)'
+
+
+# Each side ranks its matches on ids alone and keeps the best ``window`` rows
+# (offset + limit + 1). Only those are joined for their text and merged.
+# 'score' is higher for better matches. BM25 weights: owner 0, then a
+# question (or title) hit counts four times an explanation (or notes) hit.
+_SQLITE_SEARCH = text("""
+    SELECT 'card' AS kind, f.id AS id, f.deck_id AS deck_id, d.title AS title,
+           f.question AS question, f.topic AS topic, hits.score AS score, hits.position AS position
+    FROM (
+        SELECT rowid AS position, -bm25(flashcards_fts, 0.0, 4.0, 1.0, 2.0) AS score
+        FROM flashcards_fts
+        WHERE flashcards_fts MATCH :match
+        ORDER BY score DESC, position
+        LIMIT :window
+    ) AS hits
+    JOIN flashcards f ON f.rowid = hits.position
+    JOIN decks d ON d.id = f.deck_id
+    WHERE d.user_id = :user_id
+    UNION ALL
+    SELECT 'deck', d.id, d.id, d.title, NULL, NULL, hits.score, hits.position
+    FROM (
+        SELECT rowid AS position, -bm25(decks_fts, 0.0, 4.0, 1.0) AS score
+        FROM decks_fts
+        WHERE decks_fts MATCH :match
+        ORDER BY score DESC, position
+        LIMIT :window
+    ) AS hits
+    JOIN decks d ON d.rowid = hits.position
+    WHERE d.user_id = :user_id
+    ORDER BY score DESC, kind, position
+    LIMIT :limit OFFSET :offset
+""")
+
+_MYSQL_SEARCH = text(f"""
+    SELECT 'card' AS kind, f.id AS id, f.deck_id AS deck_id, d.title AS title,
+           f.question AS question, f.topic AS topic, hits.score AS score
+    FROM (
+        SELECT f.id AS card_id, {_match('f', 'flashcards')} AS score
+        FROM flashcards f
+        JOIN decks d ON d.id = f.deck_id
+        WHERE d.user_id = :user_id AND {_match('f', 'flashcards')}
+        ORDER BY score DESC, f.id
+        LIMIT :window
+    ) AS hits
+    JOIN flashcards f ON f.id = hits.card_id
+    JOIN decks d ON d.id = f.deck_id
+    UNION ALL
+    SELECT 'deck', d.id, d.id, d.title, NULL, NULL, hits.score
+    FROM (
+        SELECT d.id AS deck_id, {_match('d', 'decks')} AS score
+        FROM decks d
+        WHERE d.user_id = :user_id AND {_match('d', 'decks')}
+        ORDER BY score DESC, d.id
+        LIMIT :window
+    ) AS hits
+    JOIN decks d ON d.id = hits.deck_id
+    ORDER BY score DESC, kind, id
+    LIMIT :limit OFFSET :offset
+""")
+
+
+class FullTextSearch:
+    """
+    Creates the dialect's full-text index with the schema and runs searches.
+
+    ``db`` is the Flask-SQLAlchemy extension; the index is created and
+    dropped together with its metadata.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        event.listen(db.metadata, 'after_create', self._after_create)
+        event.listen(db.metadata, 'before_drop', self._before_drop)
+
+    def _after_create(self, metadata, connection, **kw):
+        dialect = connection.dialect.name
+        if dialect == 'sqlite':
+            for fts, statements in _SQLITE_DDL.items():
+                exists = connection.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': fts}
+                ).first()
+                for statement in statements:
+                    connection.exec_driver_sql(statement)
+                if not exists:
+                    # Index rows written before the index existed
+                    connection.exec_driver_sql(_SQLITE_REBUILD[fts])
+                    logger.info(f"Created full-text index {fts}")
+        elif dialect == 'mysql':
+            inspector = inspect(connection)
+            for table, columns in INDEXED.items():
+                name = f'ft_{table}_text'
+                if name not in {index['name'] for index in inspector.get_indexes(table)}:
+                    connection.exec_driver_sql(f"CREATE FULLTEXT INDEX {name} ON {table} ({', '.join(columns)})")
+                    logger.info(f"Created full-text index {name}")
+        else:
+            logger.warning(f"Full-text search is not supported on {dialect}; /api/search is disabled")
+
+    def _before_drop(self, metadata, connection, **kw):
+        # The triggers go with their tables; the FTS5 tables are not in the metadata
+        if connection.dialect.name == 'sqlite':
+            for fts in _SQLITE_DDL:
+                connection.exec_driver_sql(f'DROP TABLE IF EXISTS {fts}')
+
+    def rebuild(self):
+        """Re-index every card and deck (SQLite; needed after VACUUM). Caller commits."""
+        if self.db.session.get_bind().dialect.name != 'sqlite':
+            return
+        for fts, statement in _SQLITE_REBUILD.items():
+            self.db.session.execute(text(f'DELETE FROM {fts}'))
+            self.db.session.execute(text(statement))
+
+    def search(self, user_id: str, query: str, limit: int, offset: int = 0) -> Tuple[List[Dict], bool]:
+        """
+        One page of the user's cards and decks matching ``query``, best first.
+
+        Returns (results, has_more). Raises SearchUnavailable on databases
+        without a supported full-text index.
+        """
+        terms = search_terms(query)
+        dialect = self.db.session.get_bind().dialect.name
+        if dialect == 'sqlite':
+            statement, match = _SQLITE_SEARCH, fts5_query(user_id, terms) if terms else ''
+        elif dialect == 'mysql':
+            statement, match = _MYSQL_SEARCH, mysql_query(terms)
+        else:
+            raise SearchUnavailable(f'Full-text search is not supported on {dialect}')
+        if not match:
+            return [], False
+
+        rows = self.db.session.execute(statement, {
+            'match': match, 'user_id': user_id, 'window': offset + limit + 1, 'limit': limit + 1, 'offset': offset
+        }).all()
+        results = [_result(row) for row in rows[:limit]]
+        return results, len(rows) > limit
+
+
+def _result(row) -> Dict:
+    if row.kind == 'card':
+        return {
+            'kind': 'card',
+            'id': row.id,
+            'deck_id': row.deck_id,
+            'deck_title': row.title,
+            'question': row.question,
+            'topic': row.topic,
+            'score': round(float(row.score), 6)
+        }
+    return {'kind': 'deck', 'id': row.id, 'title': row.title, 'score': round(float(row.score), 6)}
@@ -0,0 +1,195 @@
+"""
+JSON encoding for API responses.
+
+Two pieces:
+
+* A pluggable encoder backend. orjson is used when it is installed, and the
+  standard library otherwise (or when ``JSON_BACKEND=stdlib``).
+  ``FastJSONProvider`` plugs the backend into Flask, so ``jsonify()`` and
+  ``request.get_json()`` use it everywhere without touching the routes.
+
+* Compiled row serializers for the hot read paths. A ``RowSerializer`` is
+  declared once per model as (key, column, kind) fields. From that it builds
+  the column list to SELECT and generates the source of a function turning
+  one result row into the response dict. Rows are plain tuples, so there is
+  no ORM object, no instrumented attribute access and no ``to_dict()`` call
+  per card. Datetimes are left as they are when the backend encodes them
+  natively.
+
+Both backends write datetimes and dates as ISO 8601, the format every
+``to_dict()`` already produces.
+"""
+
+import dataclasses
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Dict, Optional, Sequence, Tuple
+from uuid import UUID
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def _default(value):
+    """Types neither encoder handles natively"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, UUID):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class JSONBackend:
+    """Standard library encoder"""
+
+    name = 'stdlib'
+    native_datetime = False
+
+    def dumps(self, obj, sort_keys: bool = False, indent: bool = False) -> bytes:
+        separators = None if indent else (',', ':')
+        return json.dumps(obj, default=_default, sort_keys=sort_keys, ensure_ascii=False,
+                          indent=2 if indent else None, separators=separators).encode('utf-8')
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonBackend(JSONBackend):
+    """orjson encoder; several times faster and encodes datetimes itself"""
+
+    name = 'orjson'
+    native_datetime = True
+
+    def dumps(self, obj, sort_keys: bool = False, indent: bool = False) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=_default, option=option)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits, which the stdlib encoder accepts
+            return super().dumps(obj, sort_keys=sort_keys, indent=indent)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+def get_backend(name: str = 'auto') -> JSONBackend:
+    """``auto`` picks orjson when installed; ``stdlib`` forces the standard library"""
+    name = (name or 'auto').lower()
+    if name not in ('auto', 'orjson', 'stdlib'):
+        raise ValueError(f'Unknown JSON backend: {name}')
+    if name == 'stdlib' or orjson is None:
+        return JSONBackend()
+    return OrjsonBackend()
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by a ``JSONBackend``"""
+
+    backend = JSONBackend()
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self.backend.dumps(obj, sort_keys=kwargs.get('sort_keys', self.sort_keys)).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return self.backend.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = self.backend.dumps(obj, sort_keys=self.sort_keys, indent=indent)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+# Field kinds: how a column value becomes a JSON value. ``{0}`` is the value
+# expression, ``{1}`` the second column for two-column kinds.
+_KINDS = {
+    'value': '{0}',
+    'list': '({0} or [])',
+    'datetime': '({0}.isoformat() if {0} is not None else None)',
+    'percent': '(({1} / {0} * 100) if {0} > 0 else 0)',  # columns: total, part
+}
+_NATIVE_KINDS = dict(_KINDS, datetime='{0}')
+
+Field = Tuple  # (key, column) | (key, column, kind) | (key, (column, column), kind)
+
+
+class RowSerializer:
+    """
+    Turns result rows into response dicts with a generated function.
+
+        cards = RowSerializer('card', [
+            ('id', Flashcard.id),
+            ('options', Flashcard.options, 'list'),
+            ('accuracy', (Flashcard.times_studied, Flashcard.times_correct), 'percent'),
+        ], native_datetime=backend.native_datetime)
+        rows = db.session.execute(select(*cards.columns).where(...))
+        payload = cards.many(rows)
+
+    ``extra`` columns are selected after the fields (e.g. a grouping key) and
+    are read from the row by name, e.g. ``row.deck_id``. ``offset`` lets two
+    serializers share one row: the second reads its columns after the
+    first's (``select(*a.columns, *b.columns)`` with ``offset=len(a.columns)``).
+    """
+
+    def __init__(self, name: str, fields: Sequence[Field], native_datetime: bool = False,
+                 extra: Sequence = (), offset: int = 0):
+        self.name = name
+        self.fields = list(fields)
+
+        columns, positions = [], {}
+
+        def position(column) -> int:
+            key = id(column)
+            if key not in positions:
+                positions[key] = len(columns)
+                columns.append(column)
+            return positions[key]
+
+        kinds = _NATIVE_KINDS if native_datetime else _KINDS
+        entries = []
+        for field in self.fields:
+            key, source = field[0], field[1]
+            kind = field[2] if len(field) > 2 else 'value'
+            sources = source if isinstance(source, tuple) else (source,)
+            refs = [f'row[{offset + position(column)}]' for column in sources]
+            entries.append(f'{key!r}: {kinds[kind].format(*refs)}')
+
+        self.columns = columns + list(extra)
+        self.source = f"def serialize_{name}(row):\n    return {{{', '.join(entries)}}}\n"
+        namespace = {}
+        exec(compile(self.source, f'<serializer {name}>', 'exec'), namespace)
+        self.serialize: Callable[[Sequence], Dict] = namespace[f'serialize_{name}']
+
+    def __call__(self, row: Sequence) -> Dict:
+        return self.serialize(row)
+
+    def many(self, rows) -> list:
+        serialize = self.serialize
+        return [serialize(row) for row in rows]
+
+
+def install(app, backend_name: str = 'auto', sort_keys: Optional[bool] = None) -> JSONBackend:
+    """Make ``backend_name`` the app's JSON backend; returns the backend in use"""
+    provider = FastJSONProvider(app)
+    provider.backend = get_backend(backend_name)
+    if sort_keys is not None:
+        provider.sort_keys = sort_keys
+    app.json = provider
+    return provider.backend
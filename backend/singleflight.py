@@ -0,0 +1,76 @@
+"""
+Request coalescing ("single flight") for identical in-flight work.
+
+When a lecturer shares notes with a class, dozens of identical generation
+requests arrive within seconds. The first caller for a key runs the work;
+callers that arrive while it is still running wait for that result instead
+of starting their own upstream call. Coalescing is per process.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run at most one call per key at a time and share its outcome"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._counters = {'executions': 0, 'coalesced': 0, 'errors': 0}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Call ``fn`` unless a call for ``key`` is already running.
+
+        Returns (result, shared) where ``shared`` is True when the result came
+        from another caller's execution. Exceptions raised by ``fn`` are
+        re-raised in every waiting caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._counters['coalesced'] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._counters['executions'] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            with self._lock:
+                self._counters['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters, in_flight=len(self._calls))
+        calls = counters['executions'] + counters['coalesced']
+        counters['coalesced_ratio'] = round(counters['coalesced'] / calls, 4) if calls else 0.0
+        return counters
@@ -0,0 +1,200 @@
+"""
+Opt-in per-request SQL profiling with N+1 detection.
+
+When profiling is on for a request, every statement it runs is recorded with
+its duration and the application call site that issued it. Statements are
+grouped by shape (the SQL with literals and IN-lists collapsed); a shape
+executed ``n_plus_one_threshold`` times or more in one request is flagged as
+a likely N+1 query, usually a lazy relationship read inside a loop.
+
+Recording only happens on threads that have an active profile, so requests
+that are not profiled pay one attribute lookup per statement.
+
+``max_queries()`` uses the same recorder outside requests, so scripts and
+tests can assert a query budget for a block of code.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+
+_NUMBER_RE = re.compile(r'\b\d+(\.\d+)?\b')
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:\?|%s|:\w+|__\[POSTCOMPILE_\w+\])\s*,?)+\)', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_THIS_FILE = os.path.abspath(__file__)
+
+
+def statement_shape(statement: str) -> str:
+    """SQL with literals and IN-lists collapsed, so repeats of one query compare equal"""
+    shape = _STRING_RE.sub('?', statement)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = _IN_LIST_RE.sub('IN (...)', shape)
+    return _WHITESPACE_RE.sub(' ', shape).strip()
+
+
+def call_site() -> str:
+    """First stack frame in application code (outside libraries and this module)"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        raw = frame.f_code.co_filename
+        filename = os.path.abspath(raw)
+        # "<string>" frames are code generated by libraries, not app code
+        if (not raw.startswith('<') and filename.startswith(_APP_DIR)
+                and filename != _THIS_FILE and 'site-packages' not in filename):
+            return f"{os.path.relpath(filename, _APP_DIR)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return 'unknown'
+
+
+class QueryProfile:
+    """Statements recorded for one request (or one ``max_queries`` block)"""
+
+    def __init__(self, label: str = ''):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.started = time.time()
+        self.statements = []
+
+    def add(self, statement: str, seconds: float, site: str):
+        self.statements.append({
+            'sql': _WHITESPACE_RE.sub(' ', statement).strip(),
+            'shape': statement_shape(statement),
+            'ms': round(seconds * 1000, 3),
+            'call_site': site
+        })
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def total_ms(self) -> float:
+        return round(sum(item['ms'] for item in self.statements), 3)
+
+    def repeated_shapes(self, threshold: int) -> List[Dict]:
+        """Shapes run at least ``threshold`` times, most frequent first"""
+        groups = defaultdict(list)
+        for item in self.statements:
+            groups[item['shape']].append(item)
+
+        repeated = []
+        for shape, items in groups.items():
+            if len(items) >= threshold:
+                repeated.append({
+                    'shape': shape,
+                    'count': len(items),
+                    'total_ms': round(sum(item['ms'] for item in items), 3),
+                    'call_sites': sorted({item['call_site'] for item in items})
+                })
+        return sorted(repeated, key=lambda entry: -entry['count'])
+
+    def summary(self, threshold: int) -> Dict:
+        return {
+            'id': self.id,
+            'label': self.label,
+            'started_at': self.started,
+            'queries': self.count,
+            'total_ms': self.total_ms,
+            'n_plus_one': self.repeated_shapes(threshold)
+        }
+
+    def to_dict(self, threshold: int) -> Dict:
+        return dict(self.summary(threshold), statements=self.statements)
+
+    def header(self, threshold: int) -> str:
+        """Compact summary for the X-SQL-Profile response header"""
+        suspects = self.repeated_shapes(threshold)
+        return f"id={self.id}; queries={self.count}; time_ms={self.total_ms}; n_plus_one={len(suspects)}"
+
+
+class TooManyQueries(AssertionError):
+    """Raised by ``max_queries()`` when a block exceeds its query budget"""
+
+
+class SQLProfiler:
+    """Records statements for threads with an active profile and keeps recent reports"""
+
+    def __init__(self, n_plus_one_threshold: int = 3, max_reports: int = 50):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._local = threading.local()
+        self._reports = OrderedDict()
+        self._max_reports = max_reports
+        self._lock = threading.Lock()
+        self._engines = set()
+
+    def install(self, engine):
+        """Attach the cursor event listeners to an engine (idempotent)"""
+        if id(engine) in self._engines:
+            return
+        self._engines.add(id(engine))
+        event.listen(engine, 'before_cursor_execute', self._before)
+        event.listen(engine, 'after_cursor_execute', self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        if getattr(self._local, 'profile', None) is not None:
+            context._profile_started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        profile = getattr(self._local, 'profile', None)
+        if profile is not None:
+            started = getattr(context, '_profile_started', time.perf_counter())
+            profile.add(statement, time.perf_counter() - started, call_site())
+
+    def start(self, label: str = '') -> QueryProfile:
+        profile = self._local.profile = QueryProfile(label)
+        return profile
+
+    def stop(self, keep: bool = True) -> Optional[QueryProfile]:
+        profile = getattr(self._local, 'profile', None)
+        self._local.profile = None
+        if profile is not None and keep:
+            with self._lock:
+                self._reports[profile.id] = profile
+                while len(self._reports) > self._max_reports:
+                    self._reports.popitem(last=False)
+        return profile
+
+    @property
+    def active(self) -> bool:
+        return getattr(self._local, 'profile', None) is not None
+
+    def reports(self) -> List[Dict]:
+        with self._lock:
+            profiles = list(self._reports.values())
+        return [profile.summary(self.n_plus_one_threshold) for profile in reversed(profiles)]
+
+    def report(self, profile_id: str) -> Optional[Dict]:
+        with self._lock:
+            profile = self._reports.get(profile_id)
+        return profile.to_dict(self.n_plus_one_threshold) if profile else None
+
+    @contextmanager
+    def max_queries(self, limit: int, label: str = ''):
+        """
+        Fail the block if it runs more than ``limit`` statements.
+
+            with sql_profiler.max_queries(3):
+                client.get('/api/decks')
+        """
+        outer = getattr(self._local, 'profile', None)
+        profile = self.start(label)
+        try:
+            yield profile
+        finally:
+            self._local.profile = outer
+
+        if profile.count > limit:
+            lines = [f"{label or 'block'} ran {profile.count} queries (limit {limit}):"]
+            lines += [f"  [{item['call_site']}] {item['sql'][:160]}" for item in profile.statements]
+            raise TooManyQueries('\n'.join(lines))
@@ -0,0 +1,127 @@
+"""
+Daily per-user study statistics.
+
+Every completed study session is folded into one row per (user, day) holding
+session, card, accuracy and minute totals plus the streak length reached on
+that day. Stats reads then touch at most one row per day in the window
+instead of every session, and streaks never need the session history.
+
+Days are calendar days in the user's own timezone (``User.timezone``), so a
+late-evening session counts towards the day the student experienced.
+"""
+
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+    ZoneInfoNotFoundError = Exception
+
+WINDOWS = {'weekly': 7, 'monthly': 30}
+
+
+def local_day(moment: datetime, tz_name: Optional[str] = None) -> date:
+    """Calendar day of a naive UTC timestamp in the given IANA timezone"""
+    if ZoneInfo is not None and tz_name and tz_name != 'UTC':
+        try:
+            return moment.replace(tzinfo=timezone.utc).astimezone(ZoneInfo(tz_name)).date()
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    return moment.date()
+
+
+class StatsRollup:
+    """
+    Maintains and reads the daily rollup table.
+
+    ``model`` is the SQLAlchemy model with columns user_id, day, sessions,
+    cards_studied, cards_correct, accuracy_total, minutes and streak.
+    Writes join the caller's transaction; the caller commits.
+    """
+
+    def __init__(self, db, model):
+        self.db = db
+        self.model = model
+
+    def _day_row(self, user_id: str, day: date):
+        model = self.model
+        row = model.query.filter_by(user_id=user_id, day=day).with_for_update().first()
+        if row is not None:
+            return row, False
+
+        previous = model.query.filter(
+            model.user_id == user_id,
+            model.day < day
+        ).order_by(model.day.desc()).first()
+        streak = previous.streak + 1 if previous and previous.day == day - timedelta(days=1) else 1
+
+        try:
+            # Savepoint so a concurrent first session of the day only loses the insert
+            with self.db.session.begin_nested():
+                row = model(user_id=user_id, day=day, sessions=0, cards_studied=0, cards_correct=0,
+                            accuracy_total=0.0, minutes=0, streak=streak)
+                self.db.session.add(row)
+            return row, True
+        except IntegrityError:
+            return model.query.filter_by(user_id=user_id, day=day).with_for_update().first(), False
+
+    def record_session(self, user, completed_at: datetime, cards_studied: int, cards_correct: int,
+                       accuracy: float, minutes: int):
+        """Fold one completed session into its day and refresh the user's streak"""
+        model = self.model
+        day = local_day(completed_at, user.timezone)
+        row, _ = self._day_row(user.id, day)
+
+        # Increment in SQL so concurrent completions on the same day both count
+        self.db.session.query(model).filter_by(user_id=user.id, day=day).update({
+            model.sessions: model.sessions + 1,
+            model.cards_studied: model.cards_studied + (cards_studied or 0),
+            model.cards_correct: model.cards_correct + (cards_correct or 0),
+            model.accuracy_total: model.accuracy_total + (accuracy or 0.0),
+            model.minutes: model.minutes + (minutes or 0)
+        }, synchronize_session=False)
+
+        user.current_streak = row.streak
+        user.longest_streak = max(user.longest_streak or 0, row.streak)
+        return row
+
+    def summary(self, user, now: Optional[datetime] = None) -> Dict:
+        """Weekly/monthly totals and current streak from at most 30 rows"""
+        model = self.model
+        today = local_day(now or datetime.utcnow(), user.timezone)
+        longest_window = max(WINDOWS.values())
+
+        rows = model.query.filter(
+            model.user_id == user.id,
+            model.day > today - timedelta(days=longest_window)
+        ).order_by(model.day.desc()).all()
+
+        result = {}
+        for name, days in WINDOWS.items():
+            in_window = [row for row in rows if row.day > today - timedelta(days=days)]
+            sessions = sum(row.sessions for row in in_window)
+            studied = sum(row.cards_studied for row in in_window)
+            correct = sum(row.cards_correct for row in in_window)
+            result[name] = {
+                'sessions': sessions,
+                'cards_studied': studied,
+                'cards_correct': correct,
+                'accuracy': round(sum(row.accuracy_total for row in in_window) / sessions, 1) if sessions else 0,
+                'card_accuracy': round(correct / studied * 100, 1) if studied else 0,
+                'minutes': sum(row.minutes for row in in_window),
+                'active_days': len(in_window)
+            }
+
+        # A streak survives until a whole day passes without a session
+        latest = rows[0] if rows else None
+        alive = latest is not None and latest.day >= today - timedelta(days=1)
+        result['current_streak'] = latest.streak if alive else 0
+        result['today'] = today.isoformat()
+        return result
@@ -50,9 +50,51 @@ class APIService {
         });
     }
 
+    // Streams cards over server-sent events; onCard fires for each card as it
+    // arrives and the promise resolves with the saved deck once the stream ends
+    async streamFlashcards(notes, onCard = () => {}) {
+        const response = await fetch(`${this.baseURL}/generate-flashcards/stream`, {
+            method: 'POST',
+            credentials: 'include',
+            headers: this.headers,
+            body: JSON.stringify({ notes })
+        });
+
+        if (!response.ok) {
+            const data = await response.json();
+            throw new Error(data.error || `HTTP ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                const event = (rawEvent.match(/^event: (.*)$/m) || [])[1];
+                const data = JSON.parse((rawEvent.match(/^data: (.*)$/m) || [])[1] || '{}');
+
+                if (event === 'card') onCard(data);
+                if (event === 'deck') return data;
+                if (event === 'error') throw new Error(data.error);
+            }
+        }
+
+        throw new Error('Flashcard stream ended unexpectedly');
+    }
+
     // Deck Management
-    async getUserDecks() {
-        return this.request('/decks');
+    async getUserDecks(params = {}) {
+        const query = new URLSearchParams(params).toString();
+        return this.request(query ? `/decks?${query}` : '/decks');
     }
 
     async getDeck(deckId) {
@@ -84,6 +126,13 @@ class APIService {
         });
     }
 
+    async submitReviews(sessionId, reviews) {
+        return this.request(`/study-session/${sessionId}/reviews`, {
+            method: 'POST',
+            body: JSON.stringify({ reviews })
+        });
+    }
+
     async recordCardStudy(cardId, isCorrect, difficulty) {
         return this.request(`/cards/${cardId}/study`, {
             method: 'POST',
@@ -185,7 +185,15 @@ class AIStudyBuddyApp {
 
             // Also save to local storage as backup
             StorageManager.saveDeck(deck);
-            
+
+            // Questions the user already has are skipped; repeated notes reopen their deck
+            if (response.existing) {
+                this.showSuccessMessage('You already have these flashcards, so your existing deck was opened.');
+            } else if (response.duplicatesDropped) {
+                const skipped = response.duplicatesDropped;
+                this.showSuccessMessage(`Skipped ${skipped} question${skipped === 1 ? '' : 's'} you already have.`);
+            }
+
             // Load flashcards screen
             this.currentDeck = deck;
             this.currentCardIndex = 0;
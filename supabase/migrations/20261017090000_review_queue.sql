@@ -0,0 +1,10 @@
+-- Spaced repetition due-card queue
+-- Run against an existing database; new databases get these from SQLAlchemy
+
+USE ai_study_buddy;
+
+-- GET /api/review/due reads cards per deck in next_review order
+CREATE INDEX idx_flashcards_deck_next_review ON flashcards (deck_id, next_review);
+
+-- Cards created before scheduling existed have no next_review; make them due now
+UPDATE flashcards SET next_review = created_at WHERE next_review IS NULL;
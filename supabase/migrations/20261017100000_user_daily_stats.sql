@@ -0,0 +1,27 @@
+-- Daily per-user study statistics rollup
+-- Run against an existing database; new databases get this from SQLAlchemy
+
+USE ai_study_buddy;
+
+CREATE TABLE IF NOT EXISTS user_daily_stats (
+    user_id VARCHAR(36) NOT NULL,
+    day DATE NOT NULL,
+    sessions INT NOT NULL DEFAULT 0,
+    cards_studied INT NOT NULL DEFAULT 0,
+    cards_correct INT NOT NULL DEFAULT 0,
+    accuracy_total FLOAT NOT NULL DEFAULT 0,
+    minutes INT NOT NULL DEFAULT 0,
+    streak INT NOT NULL DEFAULT 1,
+    PRIMARY KEY (user_id, day),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- Backfill from completed sessions (UTC days). Streak lengths start at 1 and
+-- are rebuilt as users keep studying.
+INSERT INTO user_daily_stats (user_id, day, sessions, cards_studied, cards_correct, accuracy_total, minutes, streak)
+SELECT user_id, DATE(completed_at), COUNT(*), COALESCE(SUM(cards_studied), 0), COALESCE(SUM(cards_correct), 0),
+       COALESCE(SUM(accuracy), 0), COALESCE(SUM(duration_minutes), 0), 1
+FROM study_sessions
+WHERE completed_at IS NOT NULL
+GROUP BY user_id, DATE(completed_at)
+ON DUPLICATE KEY UPDATE sessions = VALUES(sessions);
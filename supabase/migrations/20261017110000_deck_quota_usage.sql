@@ -0,0 +1,20 @@
+-- Per-day deck creation counters used by the monthly deck quota
+-- Run against an existing database; new databases get this from SQLAlchemy
+
+USE ai_study_buddy;
+
+CREATE TABLE IF NOT EXISTS deck_quota_usage (
+    user_id VARCHAR(36) NOT NULL,
+    day DATE NOT NULL,
+    decks INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- Count decks already created inside the current window
+INSERT INTO deck_quota_usage (user_id, day, decks)
+SELECT user_id, DATE(created_at), COUNT(*)
+FROM decks
+WHERE created_at >= UTC_TIMESTAMP() - INTERVAL 30 DAY
+GROUP BY user_id, DATE(created_at)
+ON DUPLICATE KEY UPDATE decks = VALUES(decks);
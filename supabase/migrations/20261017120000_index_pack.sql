@@ -0,0 +1,19 @@
+-- Indexes for the real access patterns (previously commented out in the initial schema)
+-- Run against an existing database; new databases get these from SQLAlchemy
+
+USE ai_study_buddy;
+
+CREATE INDEX ix_users_created_at ON users (created_at);
+CREATE INDEX ix_users_last_activity ON users (last_activity);
+
+CREATE INDEX ix_decks_created_at ON decks (created_at);
+CREATE INDEX ix_decks_last_studied ON decks (last_studied);
+-- Deck listing: a user's active decks, newest first
+CREATE INDEX idx_decks_user_archived_created ON decks (user_id, is_archived, created_at);
+
+CREATE INDEX ix_flashcards_last_studied ON flashcards (last_studied);
+CREATE INDEX ix_flashcards_next_review ON flashcards (next_review);
+
+CREATE INDEX ix_study_sessions_started_at ON study_sessions (started_at);
+-- Recent completed sessions per user (stats, streaks)
+CREATE INDEX idx_study_sessions_user_completed ON study_sessions (user_id, completed_at);
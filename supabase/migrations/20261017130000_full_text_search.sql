@@ -0,0 +1,8 @@
+-- Full-text indexes for GET /api/search (cards and decks)
+-- Run against an existing database; new databases get these from db.create_all()
+-- (SQLite databases use FTS5 tables instead; see backend/search_index.py)
+
+USE ai_study_buddy;
+
+CREATE FULLTEXT INDEX ft_flashcards_text ON flashcards (question, explanation, topic);
+CREATE FULLTEXT INDEX ft_decks_text ON decks (title, original_notes);
@@ -0,0 +1,21 @@
+-- LSH buckets for near-duplicate question detection (see backend/near_duplicates.py)
+-- Run against an existing database; new databases get these from SQLAlchemy.
+-- Existing cards are backfilled per user by a background job, so no backfill is needed here.
+
+USE ai_study_buddy;
+
+CREATE TABLE IF NOT EXISTS card_lsh_buckets (
+    user_id VARCHAR(36) NOT NULL,
+    bucket BIGINT NOT NULL,
+    card_id VARCHAR(36) NOT NULL,
+    PRIMARY KEY (user_id, bucket, card_id),
+    INDEX ix_card_lsh_buckets_card_id (card_id),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (card_id) REFERENCES flashcards(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS near_duplicate_index_state (
+    user_id VARCHAR(36) NOT NULL PRIMARY KEY,
+    indexed_at DATETIME NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
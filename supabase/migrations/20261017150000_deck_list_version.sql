@@ -0,0 +1,6 @@
+-- Per-user deck list version, bumped by every deck or card write (see deck_list_version in backend/app.py)
+-- Run against an existing database; new databases get this from SQLAlchemy.
+
+USE ai_study_buddy;
+
+ALTER TABLE users ADD COLUMN deck_list_version INT NOT NULL DEFAULT 0;